@@ -196,8 +196,14 @@ class MainWindow(QMainWindow):
         self.project_tree.clear_project_items()
         self.update_window_title()
 
+    def flush_pending_tag_saves(self):
+        """Writes any debounced tag table saves through to the tag service."""
+        for tag_widget in self.open_tags.values():
+            tag_widget.flush_pending_save()
+
     def prepare_project_data(self):
         """Prepares project data for saving."""
+        self.flush_pending_tag_saves()
         self.project_service.project_data['tags'] = self.tag_service.get_all_data()
         self.project_service.project_data['tag_lists'] = self.project_service.project_data['tags']
         self.project_service.project_data['comments'] = self.comment_service.get_all_data()
@@ -461,6 +467,10 @@ class MainWindow(QMainWindow):
         if not widget:
             return
 
+        # A tag table mid-batch keeps its tab until the batch finishes
+        if isinstance(widget, TagTable) and widget.batch_in_progress:
+            return
+
         # Check if it's a screen
         screen_id_to_remove = self.get_screen_id_for_widget(widget)
         if screen_id_to_remove is not None:
@@ -482,6 +492,7 @@ class MainWindow(QMainWindow):
         
         # Check if it's a tag table
         if isinstance(widget, TagTable):
+            widget.flush_pending_save()
             tag_number_to_remove = widget.tag_data.get('number')
             if tag_number_to_remove in self.open_tags:
                 del self.open_tags[tag_number_to_remove]
@@ -489,6 +500,8 @@ class MainWindow(QMainWindow):
         self.central_widget.removeTab(index)
             
     def prompt_to_save(self):
+        # A pending tag save may still have to mark the project unsaved
+        self.flush_pending_tag_saves()
         if self.project_service.is_saved:
             return True
         
@@ -1232,6 +1245,11 @@ class MainWindow(QMainWindow):
         Args:
             event (QCloseEvent): The close event.
         """
+        # Tag tables mid-batch are still changing; close once they finish
+        if any(tag_widget.batch_in_progress for tag_widget in self.open_tags.values()):
+            event.ignore()
+            return
+
         if self.prompt_to_save():
             # Clear all graphics selections before saving state to avoid QVariant serialization errors
             # Qt tries to serialize selected graphics items as QVariant, which fails for QGraphicsItem* pointers
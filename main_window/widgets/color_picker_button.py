@@ -0,0 +1,57 @@
+# main_window\widgets\color_picker_button.py
+from PySide6.QtWidgets import QPushButton
+from PySide6.QtGui import QColor
+from PySide6.QtCore import Signal, QSize
+from styles import stylesheets
+
+from .color_selector import ColorSelector
+
+_STYLE_TMPL = stylesheets.WIDGET_COLOR_BUTTON_TEMPLATE
+
+class ColorPickerButton(QPushButton):
+    """A button that displays a color and opens a color picker when clicked."""
+    color_changed = Signal(QColor)
+    _DEFAULT_SIZE = QSize(120, 24)
+
+    def __init__(self, color='white', parent=None):
+        super().__init__(parent)
+        self._color = QColor(color)
+        self._style_pending = True
+        self.setFixedSize(self._DEFAULT_SIZE)
+        self.clicked.connect(self._open_color_picker)
+
+    def color(self):
+        """Returns the current QColor of the button."""
+        return self._color
+
+    def set_color(self, color):
+        """Sets the button's color and emits a signal if it changes."""
+        if self._color != color:
+            self._color = color
+            self._update_style()
+            self.color_changed.emit(self._color)
+
+    def showEvent(self, event):
+        # The stylesheet is applied lazily so buttons that are never shown skip the style cascade
+        if self._style_pending:
+            self._apply_style()
+        super().showEvent(event)
+
+    def _update_style(self):
+        if not self.isVisible():
+            self._style_pending = True
+            return
+        self._apply_style()
+
+    def _apply_style(self):
+        self._style_pending = False
+        style = _STYLE_TMPL.format(self._color.name())
+        # Re-applying an identical stylesheet still forces a full re-polish.
+        if style != self.styleSheet():
+            self.setStyleSheet(style)
+
+    def _open_color_picker(self):
+        """Opens the color selector dialog to choose a new color."""
+        new_color = ColorSelector.getColor(self._color, self)
+        if new_color.isValid():
+            self.set_color(new_color)
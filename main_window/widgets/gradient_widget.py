@@ -1,45 +1,23 @@
 # main_window\widgets\gradient_widget.py
 import sys
+from functools import partial
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
-    QGroupBox, QRadioButton, QPushButton, QLabel, QButtonGroup
+    QGroupBox, QRadioButton, QLabel, QButtonGroup
 )
 from PySide6.QtGui import QColor, QPainter, QLinearGradient, QBrush, QPen
 from PySide6.QtCore import Signal, QPointF, Qt
-from styles import colors, stylesheets
+from styles import colors
 
-from .color_selector import ColorSelector
+from .color_picker_button import ColorPickerButton
 
-class ColorPickerButton(QPushButton):
-    """A button that displays a color and opens a color picker when clicked."""
-    color_changed = Signal(QColor)
-
-    def __init__(self, color='white', parent=None):
-        super().__init__(parent)
-        self._color = QColor(color)
-        self.setFixedSize(120, 24)
-        self._update_style()
-        self.clicked.connect(self._open_color_picker)
-
-    def color(self):
-        """Returns the current QColor of the button."""
-        return self._color
-
-    def set_color(self, color):
-        """Sets the button's color and emits a signal if it changes."""
-        if self._color != color:
-            self._color = color
-            self._update_style()
-            self.color_changed.emit(self._color)
-
-    def _update_style(self):
-        self.setStyleSheet(stylesheets.get_widget_color_button_stylesheet(self._color.name()))
-
-    def _open_color_picker(self):
-        """Opens the color selector dialog to choose a new color."""
-        new_color = ColorSelector.getColor(self._color, self)
-        if new_color.isValid():
-            self.set_color(new_color)
+# Gradient start/end points for each stops mode, computed from the widget rect
+_STOP_POINTS = {
+    "Horizontal": lambda r: (QPointF(r.left(), r.center().y()), QPointF(r.right(), r.center().y())),
+    "Vertical": lambda r: (QPointF(r.center().x(), r.top()), QPointF(r.center().x(), r.bottom())),
+    "Up Diagonal": lambda r: (QPointF(r.bottomLeft()), QPointF(r.topRight())),
+    "Down Diagonal": lambda r: (QPointF(r.topLeft()), QPointF(r.bottomRight())),
+}
 
 class GradientPreviewWidget(QWidget):
     """A widget to display a single gradient preview."""
@@ -52,40 +30,40 @@ class GradientPreviewWidget(QWidget):
         self.color2 = color2
         self.stops = stops
         self.is_selected = False
+        self._update_stop_points()
 
     def set_selected(self, selected):
         self.is_selected = selected
         self.update()
 
     def set_gradient(self, color1, color2, stops):
+        if (color1, color2, stops) == (self.color1, self.color2, self.stops):
+            return
         self.color1 = color1
         self.color2 = color2
         self.stops = stops
+        self._update_stop_points()
         self.update()
 
+    def _update_stop_points(self):
+        """Caches the gradient start/end points for the current stops and size."""
+        points = _STOP_POINTS.get(self.stops)
+        self._start, self._end = points(self.rect()) if points else (QPointF(), QPointF())
+
+    def resizeEvent(self, event):
+        self._update_stop_points()
+        super().resizeEvent(event)
+
     def mousePressEvent(self, event):
         self.clicked.emit()
         super().mousePressEvent(event)
 
     def paintEvent(self, event):
+        # Fill and border are axis-aligned, so antialiasing only adds cost
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         rect = self.rect()
         
-        gradient = QLinearGradient()
-        if self.stops == "Horizontal":
-            gradient.setStart(QPointF(rect.left(), rect.center().y()))
-            gradient.setFinalStop(QPointF(rect.right(), rect.center().y()))
-        elif self.stops == "Vertical":
-            gradient.setStart(QPointF(rect.center().x(), rect.top()))
-            gradient.setFinalStop(QPointF(rect.center().x(), rect.bottom()))
-        elif self.stops == "Up Diagonal":
-            gradient.setStart(QPointF(rect.bottomLeft()))
-            gradient.setFinalStop(QPointF(rect.topRight()))
-        elif self.stops == "Down Diagonal":
-            gradient.setStart(QPointF(rect.topLeft()))
-            gradient.setFinalStop(QPointF(rect.bottomRight()))
-
+        gradient = QLinearGradient(self._start, self._end)
         gradient.setColorAt(0, self.color1)
         gradient.setColorAt(1, self.color2)
         
@@ -101,6 +79,17 @@ class GradientPreviewWidget(QWidget):
 
 class GradientWidget(QWidget):
     """A widget for selecting and previewing gradient colors."""
+    # Gradation type button ids, as registered with gradation_type_group
+    _HORIZONTAL, _VERTICAL, _UP_DIAGONAL, _DOWN_DIAGONAL = range(4)
+
+    # Per gradation type id: (index of the starting color, stops) for each preview
+    _PREVIEW_VARIATIONS = {
+        _HORIZONTAL: ((0, "Horizontal"), (1, "Horizontal"), (0, "Down Diagonal"), (1, "Down Diagonal")),
+        _VERTICAL: ((0, "Vertical"), (1, "Vertical"), (0, "Up Diagonal"), (1, "Up Diagonal")),
+        _UP_DIAGONAL: ((0, "Up Diagonal"), (1, "Up Diagonal"), (0, "Vertical"), (1, "Vertical")),
+        _DOWN_DIAGONAL: ((0, "Down Diagonal"), (1, "Down Diagonal"), (0, "Horizontal"), (1, "Horizontal")),
+    }
+
     def __init__(self, initial_gradient=None, parent=None):
         super().__init__(parent)
         main_layout = QVBoxLayout(self)
@@ -128,10 +117,10 @@ class GradientWidget(QWidget):
         self.radio_down_diagonal = QRadioButton("Down Diagonal")
         
         self.gradation_type_group = QButtonGroup(self)
-        self.gradation_type_group.addButton(self.radio_horizontal)
-        self.gradation_type_group.addButton(self.radio_vertical)
-        self.gradation_type_group.addButton(self.radio_up_diagonal)
-        self.gradation_type_group.addButton(self.radio_down_diagonal)
+        self.gradation_type_group.addButton(self.radio_horizontal, self._HORIZONTAL)
+        self.gradation_type_group.addButton(self.radio_vertical, self._VERTICAL)
+        self.gradation_type_group.addButton(self.radio_up_diagonal, self._UP_DIAGONAL)
+        self.gradation_type_group.addButton(self.radio_down_diagonal, self._DOWN_DIAGONAL)
 
         gradation_layout.addWidget(self.radio_horizontal)
         gradation_layout.addWidget(self.radio_vertical)
@@ -180,24 +169,18 @@ class GradientWidget(QWidget):
         # Connections
         self.color1_button.color_changed.connect(self.update_previews)
         self.color2_button.color_changed.connect(self.update_previews)
-        self.radio_horizontal.toggled.connect(self.on_gradation_type_changed)
-        self.radio_vertical.toggled.connect(self.on_gradation_type_changed)
-        self.radio_up_diagonal.toggled.connect(self.on_gradation_type_changed)
-        self.radio_down_diagonal.toggled.connect(self.on_gradation_type_changed)
+        self.gradation_type_group.buttonToggled.connect(self.on_gradation_type_changed)
 
         for preview in self.previews:
-            preview.clicked.connect(self.select_preview_slot)
+            preview.clicked.connect(partial(self.select_preview, preview))
             
         self.select_preview(self.preview1)
         self.update_previews()
 
-    def select_preview_slot(self):
-        """Slot to handle a preview click."""
-        clicked_preview = self.sender()
-        self.select_preview(clicked_preview)
-
     def select_preview(self, preview_to_select):
         """Handles the selection of a gradient preview widget."""
+        if preview_to_select is self.selected_preview:
+            return
         if self.selected_preview:
             self.selected_preview.set_selected(False)
         
@@ -205,32 +188,16 @@ class GradientWidget(QWidget):
         if self.selected_preview:
             self.selected_preview.set_selected(True)
 
-    def on_gradation_type_changed(self, checked):
+    def on_gradation_type_changed(self, button, checked):
+        # The group reports both the unchecked and the checked button; act once.
         if checked:
             self.update_previews()
 
     def update_previews(self):
         """Updates all gradient previews based on current selections."""
-        c1 = self.color1_button.color()
-        c2 = self.color2_button.color()
-
-        if self.radio_horizontal.isChecked():
-            self.preview1.set_gradient(c1, c2, "Horizontal")
-            self.preview2.set_gradient(c2, c1, "Horizontal")
-            self.preview3.set_gradient(c1, c2, "Down Diagonal")
-            self.preview4.set_gradient(c2, c1, "Down Diagonal")
-        elif self.radio_vertical.isChecked():
-            self.preview1.set_gradient(c1, c2, "Vertical")
-            self.preview2.set_gradient(c2, c1, "Vertical")
-            self.preview3.set_gradient(c1, c2, "Up Diagonal")
-            self.preview4.set_gradient(c2, c1, "Up Diagonal")
-        elif self.radio_up_diagonal.isChecked():
-            self.preview1.set_gradient(c1, c2, "Up Diagonal")
-            self.preview2.set_gradient(c2, c1, "Up Diagonal")
-            self.preview3.set_gradient(c1, c2, "Vertical")
-            self.preview4.set_gradient(c2, c1, "Vertical")
-        elif self.radio_down_diagonal.isChecked():
-            self.preview1.set_gradient(c1, c2, "Down Diagonal")
-            self.preview2.set_gradient(c2, c1, "Down Diagonal")
-            self.preview3.set_gradient(c1, c2, "Horizontal")
-            self.preview4.set_gradient(c2, c1, "Horizontal")
+        variations = self._PREVIEW_VARIATIONS.get(self.gradation_type_group.checkedId())
+        if variations is None:
+            return
+        pair = (self.color1_button.color(), self.color2_button.color())
+        for preview, (first, stops) in zip(self.previews, variations):
+            preview.set_gradient(pair[first], pair[1 - first], stops)
@@ -1,46 +1,15 @@
 # main_window\widgets\pattern_widget.py
 import sys
+from functools import partial
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
-    QGroupBox, QPushButton, QLabel, QFrame
+    QGroupBox, QLabel, QFrame
 )
 from PySide6.QtGui import QColor, QPainter, QBrush, QPen
 from PySide6.QtCore import Signal, Qt
-from styles import colors, stylesheets
-
-from .color_selector import ColorSelector
-
-class ColorPickerButton(QPushButton):
-    """A button that displays a color and opens a color picker when clicked."""
-    color_changed = Signal(QColor)
-
-    def __init__(self, color='white', parent=None):
-        super().__init__(parent)
-        self._color = QColor(color)
-        self.setFixedSize(120, 24)
-        self._update_style()
-        self.clicked.connect(self._open_color_picker)
-
-    def color(self):
-        """Returns the current QColor of the button."""
-        return self._color
-
-    def set_color(self, color):
-        """Sets the button's color and emits a signal if it changes."""
-        if self._color != color:
-            self._color = color
-            self._update_style()
-            self.color_changed.emit(self._color)
-
-    def _update_style(self):
-        self.setStyleSheet(stylesheets.get_widget_color_button_stylesheet(self._color.name()))
-
-    def _open_color_picker(self):
-        """Opens the color selector dialog to choose a new color."""
-        new_color = ColorSelector.getColor(self._color, self)
-        if new_color.isValid():
-            self.set_color(new_color)
+from styles import colors
 
+from .color_picker_button import ColorPickerButton
 
 class PatternPreviewWidget(QWidget):
     """A widget to display a single fill pattern."""
@@ -59,6 +28,8 @@ class PatternPreviewWidget(QWidget):
         self.update()
 
     def set_colors(self, fg_color, bg_color):
+        if fg_color == self.fg_color and bg_color == self.bg_color:
+            return
         self.fg_color = fg_color
         self.bg_color = bg_color
         self.update()
@@ -68,8 +39,8 @@ class PatternPreviewWidget(QWidget):
         super().mousePressEvent(event)
 
     def paintEvent(self, event):
+        # Fill and border are axis-aligned, so antialiasing only adds cost
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         
         brush = QBrush(self.fg_color, self.pattern)
         painter.fillRect(self.rect(), self.bg_color)
@@ -124,7 +95,7 @@ class PatternWidget(QWidget):
         for i, pattern in enumerate(patterns):
             row, col = divmod(i, 6)
             preview = PatternPreviewWidget(pattern, self.fg_color_button.color(), self.bg_color_button.color())
-            preview.clicked.connect(self.select_pattern_slot)
+            preview.clicked.connect(partial(self.select_pattern, preview))
             self.pattern_grid.addWidget(preview, row, col)
             self.pattern_previews.append(preview)
 
@@ -144,11 +115,9 @@ class PatternWidget(QWidget):
         self.fg_color_button.color_changed.connect(self.update_pattern_colors)
         self.bg_color_button.color_changed.connect(self.update_pattern_colors)
 
-    def select_pattern_slot(self):
-        clicked_preview = self.sender()
-        self.select_pattern(clicked_preview)
-
     def select_pattern(self, preview_to_select):
+        if preview_to_select is self.selected_pattern_preview:
+            return
         if self.selected_pattern_preview:
             self.selected_pattern_preview.set_selected(False)
         self.selected_pattern_preview = preview_to_select
@@ -1,17 +1,94 @@
 # main_window\widgets\tree.py
 from PySide6.QtWidgets import QTreeWidget, QTreeWidgetItem, QAbstractItemView
-from PySide6.QtGui import QIcon, QPixmap
-from PySide6.QtCore import Qt
+from PySide6.QtGui import QIcon, QImage, QPainter
+from PySide6.QtCore import Qt, QStandardPaths
+from PySide6.QtSvg import QSvgRenderer
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
+import math
+import os
+import tempfile
 from styles import stylesheets
 
+# Resource paths are resolved once at import instead of per tree instance
+_ICON_DIR = Path(__file__).parent.parent / "resources" / "icons"
+_EXPAND_ICON = (_ICON_DIR / "icon-park-solid-add.svg").as_posix()
+_COLLAPSE_ICON = (_ICON_DIR / "icon-park-solid-subtract.svg").as_posix()
+_VLINE_ICON = (_ICON_DIR / "branch-vline.svg").as_posix()
+_BRANCH_MORE_ICON = (_ICON_DIR / "branch-more.svg").as_posix()
+_BRANCH_END_ICON = (_ICON_DIR / "branch-end.svg").as_posix()
+
+# Rasterized copies of the branch SVGs live in this per-user cache subdirectory
+# so QSS does not re-render them
+_RASTER_SUBDIR = "hmi-designer-tree-icons"
+
+
+def _raster_dir() -> Optional[Path]:
+    """The per-user directory for rasterized icons, or None if there is none."""
+    cache_root = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+    if not cache_root:
+        return None
+    return Path(cache_root) / _RASTER_SUBDIR
+
+
+@lru_cache(maxsize=32)
+def _rasterized_icon_path(svg_path: str, scale: int) -> str:
+    """
+    Render an SVG once to a PNG at the given integer device pixel ratio.
+
+    The file is named with Qt's "@Nx" suffix so the stylesheet loader picks up
+    the correct device pixel ratio. Falls back to the SVG path if rendering fails.
+    """
+    source = Path(svg_path)
+    renderer = QSvgRenderer(svg_path)
+    if not renderer.isValid():
+        return svg_path
+
+    raster_dir = _raster_dir()
+    if raster_dir is None:
+        return svg_path
+
+    suffix = f"@{scale}x" if scale > 1 else ""
+    target = raster_dir / f"{source.stem}{suffix}.png"
+    try:
+        if not target.exists() or target.stat().st_mtime < source.stat().st_mtime:
+            raster_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            size = renderer.defaultSize() * scale
+            image = QImage(size, QImage.Format.Format_ARGB32_Premultiplied)
+            image.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(image)
+            renderer.render(painter)
+            painter.end()
+            # Write to a temporary name and rename it into place, so another
+            # instance never loads a half-written PNG
+            fd, temp_name = tempfile.mkstemp(suffix=".png", dir=raster_dir)
+            os.close(fd)
+            try:
+                if not image.save(temp_name, "PNG"):
+                    return svg_path
+                os.replace(temp_name, target)
+            finally:
+                if os.path.exists(temp_name):
+                    os.remove(temp_name)
+    except OSError:
+        return svg_path
+    return target.as_posix()
+
 class CustomTreeWidget(QTreeWidget):
     """
     A custom QTreeWidget with custom expand/collapse icons from icon-park-solid.
     Includes visual indicators for parent-child relationships, multi-column support,
     and enhanced selection/styling capabilities matching tag table functionality.
     """
+    # Branch icon paths (subclasses may override these to use different artwork)
+    ICON_DIR = _ICON_DIR
+    EXPAND_ICON_PATH = _EXPAND_ICON
+    COLLAPSE_ICON_PATH = _COLLAPSE_ICON
+    VLINE_PATH = _VLINE_ICON
+    BRANCH_MORE_PATH = _BRANCH_MORE_ICON
+    BRANCH_END_PATH = _BRANCH_END_ICON
+
     def __init__(self, parent=None):
         """
         Initializes the CustomTreeWidget with custom icons and styling.
@@ -20,16 +97,15 @@ class CustomTreeWidget(QTreeWidget):
         self.setHeaderHidden(True)
         
         # Get the resource path for icons
-        self.icon_path = Path(__file__).parent.parent / "resources" / "icons"
+        self.icon_path = self.ICON_DIR
         
-        # Load expand/collapse icons with proper path formatting
-        expand_icon_path = str(self.icon_path / "icon-park-solid-add.svg").replace("\\", "/")
-        collapse_icon_path = str(self.icon_path / "icon-park-solid-subtract.svg").replace("\\", "/")
-        
-        # Load branch line SVG icons
-        vline_path = str(self.icon_path / "branch-vline.svg").replace("\\", "/")
-        branch_more_path = str(self.icon_path / "branch-more.svg").replace("\\", "/")
-        branch_end_path = str(self.icon_path / "branch-end.svg").replace("\\", "/")
+        # Expand/collapse and branch line icons, pre-rasterized for this screen's DPR
+        scale = max(1, math.ceil(self.devicePixelRatioF()))
+        expand_icon_path = _rasterized_icon_path(self.EXPAND_ICON_PATH, scale)
+        collapse_icon_path = _rasterized_icon_path(self.COLLAPSE_ICON_PATH, scale)
+        vline_path = _rasterized_icon_path(self.VLINE_PATH, scale)
+        branch_more_path = _rasterized_icon_path(self.BRANCH_MORE_PATH, scale)
+        branch_end_path = _rasterized_icon_path(self.BRANCH_END_PATH, scale)
         
         # Configure selection mode and row appearance
         self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
@@ -37,7 +113,7 @@ class CustomTreeWidget(QTreeWidget):
         self.setRootIsDecorated(True)
         
         # Set indentation for proper branch line display
-        self.setIndentation(24)  # Proper spacing for branch lines
+        self.setIndentation(24)  # Proper spacing for branch lines (also caches it)
         
         # Enable uniform row heights for consistent line drawing
         self.setUniformRowHeights(True)
@@ -62,6 +138,26 @@ class CustomTreeWidget(QTreeWidget):
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self._on_context_menu)
     
+    def setIndentation(self, indentation):
+        """Keep the cached indentation used for branch-area hit testing in sync."""
+        super().setIndentation(indentation)
+        self._indent = self.indentation()
+
+    def _is_in_branch_area(self, index, x) -> bool:
+        """
+        Check whether a viewport x coordinate falls left of an item's content area.
+
+        Uses the cached indentation and the item depth instead of asking the view
+        for the item's visual rectangle on every mouse event.
+        """
+        depth = 0 if self.rootIsDecorated() else -1
+        parent = index.parent()
+        while parent.isValid():
+            depth += 1
+            parent = parent.parent()
+        content_left = self.header().sectionViewportPosition(0) + self._indent * (depth + 1)
+        return x < content_left
+
     def mousePressEvent(self, event):
         """
         Override mouse press event to prevent selection when clicking on branch lines.
@@ -69,10 +165,8 @@ class CustomTreeWidget(QTreeWidget):
         if event.button() == Qt.MouseButton.LeftButton:
             index = self.indexAt(event.pos())
             if index.isValid() and index.column() == 0:
-                # Get the visual rectangle of the item (content area)
-                rect = self.visualRect(index)
                 # If the click is to the left of the content area, it's in the branch area
-                if event.pos().x() < rect.left():
+                if self._is_in_branch_area(index, event.pos().x()):
                     # Toggle expansion if it's a parent item
                     if self.model().hasChildren(index):
                         self.setExpanded(index, not self.isExpanded(index))
@@ -88,8 +182,7 @@ class CustomTreeWidget(QTreeWidget):
         if event.button() == Qt.MouseButton.LeftButton:
             index = self.indexAt(event.pos())
             if index.isValid() and index.column() == 0:
-                rect = self.visualRect(index)
-                if event.pos().x() < rect.left():
+                if self._is_in_branch_area(index, event.pos().x()):
                     # Return without calling super() to prevent selection and itemDoubleClicked signal
                     return
         
@@ -226,7 +319,45 @@ class CustomTreeWidget(QTreeWidget):
             self.addTopLevelItem(item)
         
         return item
-    
+
+    def add_items_bulk(self, parent: Optional[QTreeWidgetItem], rows: list, icon: Optional[QIcon] = None, is_parent: bool = False) -> list:
+        """
+        Add many items at once, inserting them into the tree in a single batch.
+
+        Args:
+            parent: Parent QTreeWidgetItem or None for root items
+            rows: List of entries, each either a text string or a list of column texts
+            icon: Optional QIcon applied to the first column of every item
+            is_parent: Whether these items can have children (affects icon display)
+
+        Returns:
+            List of the created QTreeWidgetItems
+        """
+        items = []
+        for row in rows:
+            item = QTreeWidgetItem()
+            if isinstance(row, str):
+                item.setText(0, row)
+            else:
+                for col_idx, text in enumerate(row):
+                    item.setText(col_idx, str(text))
+            if icon:
+                item.setIcon(0, icon)
+            item.setData(0, Qt.ItemDataRole.UserRole, is_parent)
+            items.append(item)
+
+        # Attach detached items in one call so the view relayouts only once
+        self.setUpdatesEnabled(False)
+        try:
+            if parent:
+                parent.addChildren(items)
+            else:
+                self.addTopLevelItems(items)
+        finally:
+            self.setUpdatesEnabled(True)
+
+        return items
+
     def _on_item_expanded(self, item: QTreeWidgetItem):
         """Handle item expansion - show collapse icon."""
         # Update the visual indication for expanded state
@@ -4,6 +4,8 @@ import collections
 import logging
 import csv
 import json
+from functools import lru_cache
+from itertools import cycle
 try:
     from openpyxl import Workbook, load_workbook
     from openpyxl.styles import Font, PatternFill, Alignment
@@ -11,7 +13,7 @@ try:
 except ImportError:
     OPENPYXL_AVAILABLE = False
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QToolBar, QTableWidget, QTableWidgetItem,
+    QWidget, QVBoxLayout, QToolBar, QTableView, QTableWidgetSelectionRange,
     QLineEdit, QMessageBox, QAbstractItemView, QHeaderView, QApplication, QLabel,
     QStyledItemDelegate, QMenu, QListWidget, QSpinBox, QDialog, QFormLayout, 
     QPushButton, QHBoxLayout, QStyle, QFileDialog
@@ -21,9 +23,12 @@ from main_window.services.icon_service import IconService
 from PySide6.QtGui import (
     QColor, QBrush, QFont, QPainter, QPen, QKeySequence, QUndoStack, QUndoCommand, QAction
 )
-from PySide6.QtCore import Qt, QRectF, QPointF, Signal, QEvent, QItemSelection, QItemSelectionModel, QTimer
+from PySide6.QtCore import (
+    Qt, QRectF, QPointF, Signal, QEvent, QItemSelection, QItemSelectionModel, QTimer,
+    QAbstractTableModel, QModelIndex
+)
 from styles import colors, stylesheets
-from .comment_utils import FormulaParser, FUNCTION_HINTS, adjust_formula_references, col_str_to_int, col_int_to_str
+from .comment_utils import FormulaParser, FormulaCompiler, FUNCTION_HINTS, adjust_formula_references, col_str_to_int, col_int_to_str
 from .optimized_operations import OptimizedBatchDelete, OptimizedColumnAddition
 from .performance_config import MAX_COLUMNS, MAX_ROWS
 from .export_handler import ExportHandler
@@ -32,6 +37,152 @@ from .virtual_spreadsheet import VirtualSpreadsheet
 
 logger = logging.getLogger(__name__)
 
+# Formula-bar and fill-drag patterns, compiled once instead of per keystroke/cell
+_FORMULA_REF_RE = re.compile(r"\$?([A-Z]+)\$?(\d+)")  # Handles $A$1, $A1 and A$1 too
+_OPEN_FUNCTION_RE = re.compile(r"([A-Z_]+)\(([^)]*)$")
+_FUNCTION_PREFIX_RE = re.compile(r"=([A-Z_]*)$")
+_NUMBER_SUFFIX_RE = re.compile(r"^(.*?)(\d+)$")
+
+# Syntax-hint argument lists, split once per function rather than per keystroke
+_HINT_ARGS = {name: tuple(hint[len(name) + 1:-1].split(',')) for name, hint in FUNCTION_HINTS.items()}
+
+
+def _build_function_trie(names):
+    """
+    Builds a character trie over function names. Each node lists, under the key
+    None, every name starting with its prefix, in the order given.
+    """
+    root = {None: []}
+    for name in names:
+        node = root
+        node[None].append(name)
+        for char in name:
+            node = node.setdefault(char, {None: []})
+            node[None].append(name)
+    return root
+
+
+# Completer prefix lookup walks one node per typed character
+_FUNCTION_TRIE = _build_function_trie(FUNCTION_HINTS)
+
+# Column letters for every column a sheet can be created with, built once
+_COLUMN_LABELS = tuple(col_int_to_str(i) for i in range(MAX_COLUMNS))
+
+
+def _column_label(col):
+    """Returns the letters of a column; imported sheets may be wider than MAX_COLUMNS."""
+    return _COLUMN_LABELS[col] if 0 <= col < MAX_COLUMNS else col_int_to_str(col)
+
+
+# Interned style objects: cells share a handful of fonts and colors, so build each once.
+# Callers must treat the returned objects as read-only.
+@lru_cache(maxsize=8)
+def _font_for(bold, italic, underline):
+    font = QFont()
+    font.setBold(bold)
+    font.setItalic(italic)
+    font.setUnderline(underline)
+    return font
+
+
+@lru_cache(maxsize=256)
+def _color_for(name):
+    return QColor(name)
+
+
+@lru_cache(maxsize=256)
+def _brush_for(name):
+    return QBrush(_color_for(name))
+
+
+@lru_cache(maxsize=256)
+def _pen_for(name):
+    return QPen(_color_for(name))
+
+
+@lru_cache(maxsize=1)
+def _selection_fill_color():
+    return QColor(colors.COLOR_SELECTION_FILL).lighter(150)
+
+
+def _shift_cell_keys(store, axis, index, delta):
+    """
+    Returns a copy of a (row, col)-keyed dict with keys at or past `index` along
+    `axis` (0 = rows, 1 = columns) moved by `delta`. A negative delta drops the
+    keys in the removed span.
+    """
+    removed_end = index - delta if delta < 0 else index
+    result = {}
+    for key, value in store.items():
+        pos = key[axis]
+        if pos >= index:
+            if pos < removed_end:
+                continue
+            key = (pos + delta, key[1]) if axis == 0 else (key[0], pos + delta)
+        result[key] = value
+    return result
+
+
+def _format_float(value):
+    return str(int(value)) if value.is_integer() else f"{value:.2f}"
+
+
+# Formula results are formatted by exact type: one dict lookup per evaluation
+_RESULT_FORMATTERS = {
+    bool: lambda value: str(value).upper(),
+    float: _format_float,
+    int: str,
+    str: str,
+}
+
+
+# Dependency-graph nodes are single ints (row * stride + col): an int hashes and
+# compares faster than a (row, col) tuple and takes less memory per edge. The
+# stride sits well above MAX_COLUMNS because imports may widen a sheet past it.
+_CELL_KEY_STRIDE = 1 << 16
+
+
+def _cell_key(row, col):
+    return row * _CELL_KEY_STRIDE + col
+
+
+def _cell_pos(key):
+    return divmod(key, _CELL_KEY_STRIDE)
+
+
+def _shift_cell_key(key, axis, index, delta):
+    """Int-key counterpart of _shift_cell_keys for one key; None if it was removed."""
+    row, col = divmod(key, _CELL_KEY_STRIDE)
+    pos = row if axis == 0 else col
+    if pos < index:
+        return key
+    if delta < 0 and pos < index - delta:
+        return None
+    return key + (delta * _CELL_KEY_STRIDE if axis == 0 else delta)
+
+
+def _collect_indices(spans, size):
+    """Returns the distinct indices covered by inclusive (first, last) spans, highest first."""
+    if sum(last - first + 1 for first, last in spans) <= 1000:
+        return sorted({i for first, last in spans for i in range(first, last + 1)}, reverse=True)
+    # Large selections mark a bitmap instead of hashing every index
+    bits = bytearray(max([size] + [last + 1 for _, last in spans]))
+    for first, last in spans:
+        bits[first:last + 1] = b'\x01' * (last - first + 1)
+    return [i for i in range(len(bits) - 1, -1, -1) if bits[i]]
+
+def _index_runs(indices):
+    """Groups descending row/column indices into (start, count) runs of consecutive values."""
+    runs = []
+    for i in indices:
+        if runs and runs[-1][0] - 1 == i:
+            runs[-1][0] = i
+            runs[-1][1] += 1
+        else:
+            runs.append([i, 1])
+    return [tuple(run) for run in runs]
+
+
 # --- Insert Quantity Dialog ---
 
 class InsertQuantityDialog(QDialog):
@@ -115,6 +266,27 @@ class ChangeCellCommand(QUndoCommand):
         reversed_changes = [(r, c, n, o) for r, c, o, n in self.changes]
         self.table.apply_changes(reversed_changes)
 
+# Marks a cell key that was absent, so undo removes it instead of storing a value
+_UNSET = object()
+
+class CellPatchCommand(QUndoCommand):
+    """
+    An undo command for setting one key on many cells.
+    Keeps only (row, col, old_value, new_value) per cell rather than whole cell
+    dicts; key_path is e.g. ('value',), ('font', 'bold') or ('bg_color',).
+    """
+    def __init__(self, table, key_path, patches, text="Cell Change"):
+        super().__init__(text)
+        self.table = table
+        self.key_path = key_path
+        self.patches = patches
+
+    def redo(self):
+        self.table.apply_cell_patch(self.key_path, [(r, c, n) for r, c, _, n in self.patches])
+
+    def undo(self):
+        self.table.apply_cell_patch(self.key_path, [(r, c, o) for r, c, o, _ in self.patches])
+
 class ResizeCommand(QUndoCommand):
     """An undo command for adding/removing rows or columns."""
     def __init__(self, table, action, index, count=1):
@@ -127,26 +299,16 @@ class ResizeCommand(QUndoCommand):
 
     def redo(self):
         if 'add' in self.action:
-            # For add operations, save the data that's being replaced
-            self.saved_data = []
-            if self.action == 'add_row':
-                for c in range(self.table.columnCount()):
-                    item = self.table.item(self.index, c)
-                    self.saved_data.append(item.get_data() if item else {'value': ''})
-            elif self.action == 'add_col':
-                for r in range(self.table.rowCount()):
-                    item = self.table.item(r, self.index)
-                    self.saved_data.append(item.get_data() if item else {'value': ''})
+            # Inserting replaces nothing, and undo just removes the new rows/columns
             self.table.perform_insert(self.action, self.index, self.count)
         else:
-            self.saved_data = self.table.perform_remove(self.action, self.index)
+            self.saved_data = self.table.perform_remove(self.action, self.index, self.count)
 
     def undo(self):
         if 'add' in self.action:
             # Undo add = remove the same count that was added
             remove_action = self.action.replace('add', 'remove')
-            for _ in range(self.count):
-                self.table.perform_remove(remove_action, self.index)
+            self.table.perform_remove(remove_action, self.index, self.count)
         else:
             # Undo remove = insert and restore
             insert_action = self.action.replace('remove', 'add')
@@ -310,17 +472,301 @@ class CommentTable(QWidget):
                 command = ChangeCellCommand(self.table_widget, changes, "Edit Cell")
                 self.table_widget.undo_stack.push(command)
 
-class SpreadsheetItem(QTableWidgetItem):
+class SpreadsheetItem:
+    """
+    Lightweight handle onto one cell of a SpreadsheetModel.
+
+    Mirrors the subset of the QTableWidgetItem API used by the spreadsheet and
+    the import/export handlers. A detached item keeps its own data until it is
+    bound to a cell via Spreadsheet.setItem().
+    """
+    __slots__ = ('_model', '_row', '_col', '_data')
+
     def __init__(self, data=None):
-        super().__init__()
-        if data is None: data = {'value': ''}
-        self.set_data(data)
+        self._model = None
+        self._row = -1
+        self._col = -1
+        self._data = data if data is not None else {'value': ''}
+
+    def _bind(self, model, row, col):
+        self._model = model
+        self._row = row
+        self._col = col
+
+    def row(self):
+        return self._row
+
+    def column(self):
+        return self._col
 
     def get_data(self):
-        return self.data(Qt.ItemDataRole.UserRole) or {'value': ''}
+        if self._model is None:
+            return self._data
+        return self._model.cell(self._row, self._col) or {'value': ''}
 
     def set_data(self, data):
-        self.setData(Qt.ItemDataRole.UserRole, data)
+        if self._model is None:
+            self._data = data
+            return
+        # No-op writes emit no dataChanged. The same dict object is let through,
+        # since it may have been edited in place and need re-indexing.
+        current = self._model.cell(self._row, self._col)
+        if data is not current and data == current:
+            return
+        self._model.set_cell(self._row, self._col, data)
+        self._model.notify_cells_changed(self._row, self._col, self._row, self._col)
+
+    def text(self):
+        if self._model is None:
+            return str(self._data.get('value', ''))
+        return self._model.display_text(self._row, self._col)
+
+    def setText(self, text):
+        if self._model is not None:
+            self._model.set_display(self._row, self._col, text)
+
+
+class SpreadsheetModel(QAbstractTableModel):
+    """
+    Sparse table model backing the Spreadsheet view.
+
+    Cell dicts live in `_cells` keyed by (row, col); evaluated formula results
+    live in `_display`. Cells that were never written cost nothing, and
+    non-formula cells display their raw value without a `_display` entry.
+    `_formulas` is a separate column holding just the raw text of cells whose
+    value starts with '=', so formula passes never visit plain cells or dig
+    through cell dicts.
+    """
+    CHANGED_ROLES = [
+        Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.FontRole,
+        Qt.ItemDataRole.BackgroundRole, Qt.ItemDataRole.ForegroundRole,
+    ]
+
+    def __init__(self, rows=0, columns=0, parent=None):
+        super().__init__(parent)
+        self._rows = rows
+        self._cols = columns
+        self._cells = {}
+        self._display = {}
+        self._formulas = {}
+
+    # --- QAbstractTableModel interface ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._cols
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEditable | Qt.ItemFlag.ItemIsEnabled
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        key = (index.row(), index.column())
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.display_text(*key)
+        cell = self._cells.get(key)
+        if role == Qt.ItemDataRole.UserRole:
+            return cell
+        if cell is None:
+            return None
+        if role == Qt.ItemDataRole.EditRole:
+            return str(cell.get('value', ''))
+        if role == Qt.ItemDataRole.FontRole:
+            font_data = cell.get('font')
+            if not font_data:
+                return None
+            return _font_for(bool(font_data.get('bold', False)), bool(font_data.get('italic', False)),
+                             bool(font_data.get('underline', False)))
+        if role == Qt.ItemDataRole.BackgroundRole:
+            bg_color = cell.get('bg_color')
+            return _brush_for(bg_color) if bg_color else None
+        if role == Qt.ItemDataRole.ForegroundRole:
+            text_color = cell.get('text_color')
+            return _brush_for(text_color) if text_color else None
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return _column_label(section)
+        return str(section + 1)
+
+    def insertRows(self, row, count, parent=QModelIndex()):
+        if parent.isValid() or count <= 0:
+            return False
+        self.beginInsertRows(QModelIndex(), row, row + count - 1)
+        self._shift(0, row, count)
+        self._rows += count
+        self.endInsertRows()
+        return True
+
+    def removeRows(self, row, count, parent=QModelIndex()):
+        if parent.isValid() or count <= 0 or row + count > self._rows:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row + count - 1)
+        self._shift(0, row, -count)
+        self._rows -= count
+        self.endRemoveRows()
+        return True
+
+    def insertColumns(self, column, count, parent=QModelIndex()):
+        if parent.isValid() or count <= 0:
+            return False
+        self.beginInsertColumns(QModelIndex(), column, column + count - 1)
+        self._shift(1, column, count)
+        self._cols += count
+        self.endInsertColumns()
+        return True
+
+    def removeColumns(self, column, count, parent=QModelIndex()):
+        if parent.isValid() or count <= 0 or column + count > self._cols:
+            return False
+        self.beginRemoveColumns(QModelIndex(), column, column + count - 1)
+        self._shift(1, column, -count)
+        self._cols -= count
+        self.endRemoveColumns()
+        return True
+
+    # --- Cell storage ---
+
+    def _shift(self, axis, index, delta):
+        """Re-key cells at or past `index` along `axis` by `delta`, dropping removed ones."""
+        self._cells = _shift_cell_keys(self._cells, axis, index, delta)
+        self._display = _shift_cell_keys(self._display, axis, index, delta)
+        self._formulas = _shift_cell_keys(self._formulas, axis, index, delta)
+
+    def set_shape(self, rows, columns):
+        if rows > self._rows:
+            self.insertRows(self._rows, rows - self._rows)
+        elif rows < self._rows:
+            self.removeRows(rows, self._rows - rows)
+        if columns > self._cols:
+            self.insertColumns(self._cols, columns - self._cols)
+        elif columns < self._cols:
+            self.removeColumns(columns, self._cols - columns)
+
+    def load(self, table_data):
+        """Replaces shape and contents from a list of row lists in one model reset."""
+        self.beginResetModel()
+        self._rows = len(table_data)
+        self._cols = len(table_data[0]) if table_data else 0
+        self._display = {}
+        # Fill the stores directly; set_cell's per-call formula bookkeeping is
+        # redundant when every key is new.
+        cells = self._cells = {}
+        formulas = self._formulas = {}
+        for r, row in enumerate(table_data):
+            for c, cell_data in enumerate(row):
+                key = (r, c)
+                cells[key] = cell_data
+                value = cell_data.get('value', '')
+                if isinstance(value, str) and value[:1] == '=':
+                    formulas[key] = value
+        self.endResetModel()
+
+    def cell(self, row, col):
+        return self._cells.get((row, col))
+
+    def snapshot(self):
+        """
+        Returns the whole table as row lists of cell dicts for saving. Stored dicts
+        are shared, not copied, and empty cells all share one placeholder.
+        """
+        get = self._cells.get
+        empty = {'value': ''}
+        columns = range(self._cols)
+        return [[get((r, c)) or empty for c in columns] for r in range(self._rows)]
+
+    def cells_in(self, top, left, bottom, right):
+        """
+        Returns ((row, col), data) for the stored cells inside a rectangle, walking
+        whichever is smaller: the rectangle or the cell store.
+        """
+        cells = self._cells
+        if (bottom - top + 1) * (right - left + 1) <= len(cells):
+            keys = ((r, c) for r in range(top, bottom + 1) for c in range(left, right + 1))
+            return [(key, cells[key]) for key in keys if key in cells]
+        return [
+            (key, data) for key, data in cells.items()
+            if top <= key[0] <= bottom and left <= key[1] <= right
+        ]
+
+    def row_cells(self, row):
+        """Returns the stored dicts of one row, None where a cell is empty."""
+        get = self._cells.get
+        return [get((row, c)) for c in range(self._cols)]
+
+    def column_cells(self, col):
+        """Returns the stored dicts of one column, None where a cell is empty."""
+        get = self._cells.get
+        return [get((r, col)) for r in range(self._rows)]
+
+    def set_cell(self, row, col, data):
+        """Stores a cell dict without emitting dataChanged; callers batch notifications."""
+        key = (row, col)
+        self._cells[key] = data
+        value = data.get('value', '')
+        # Only strings can hold a formula; skip the str() round-trip for numbers
+        if isinstance(value, str) and value[:1] == '=':
+            self._formulas[key] = value
+        else:
+            self._formulas.pop(key, None)
+
+    def has_cell(self, row, col):
+        return (row, col) in self._cells
+
+    def iter_cells(self):
+        """Returns a snapshot of ((row, col), data) pairs for every stored cell."""
+        return list(self._cells.items())
+
+    def formula(self, row, col):
+        """Returns the raw formula text (including '=') of a cell, or None."""
+        return self._formulas.get((row, col))
+
+    def iter_formulas(self):
+        """Returns a snapshot of ((row, col), formula) pairs for cells holding a formula."""
+        return list(self._formulas.items())
+
+    def display_text(self, row, col):
+        text = self._display.get((row, col))
+        if text is not None:
+            return text
+        cell = self._cells.get((row, col))
+        return str(cell.get('value', '')) if cell else ''
+
+    def set_display(self, row, col, text):
+        """Stores a formula result; returns True if it differs from the one shown before."""
+        key = (row, col)
+        changed = self._display.get(key) != text
+        self._display[key] = text
+        return changed
+
+    def clear_display(self, row, col):
+        self._display.pop((row, col), None)
+
+    def clear_all_display(self):
+        self._display.clear()
+
+    def prune_display(self):
+        """Drops cached results of cells that no longer hold a formula."""
+        stale = [key for key in self._display if key not in self._formulas]
+        for key in stale:
+            del self._display[key]
+
+    def notify_cells_changed(self, top, left, bottom, right):
+        """Emits a single dataChanged covering the given cell rectangle."""
+        if bottom < top or right < left:
+            return
+        self.dataChanged.emit(self.index(top, left), self.index(bottom, right), self.CHANGED_ROLES)
+
+    def notify_all_changed(self):
+        self.notify_cells_changed(0, 0, self._rows - 1, self._cols - 1)
 
 class ExcelHeaderView(QHeaderView):
     def __init__(self, orientation, parent=None):
@@ -438,22 +884,19 @@ class SpreadsheetDelegate(QStyledItemDelegate):
         # Draw background
         if is_selected:
             # For selected cells, use light green background
-            painter.fillRect(option.rect, QColor(colors.COLOR_SELECTION_FILL).lighter(150))
+            painter.fillRect(option.rect, _selection_fill_color())
         elif bg_color:
-            painter.fillRect(option.rect, QColor(bg_color))
+            painter.fillRect(option.rect, _color_for(bg_color))
         else:
-            painter.fillRect(option.rect, QColor(colors.BG_SPREADSHEET_CELL))
+            painter.fillRect(option.rect, _color_for(colors.BG_SPREADSHEET_CELL))
         
         # For selected cells, ensure text color is dark for contrast
         if is_selected:
             # Use dark text (black) on light selection background for visibility
-            text_pen = QPen(colors.TEXT_DARK)
+            text_pen = _pen_for(colors.TEXT_DARK)
         else:
             # Use custom text color if set, otherwise use default
-            if text_color:
-                text_pen = QPen(QColor(text_color))
-            else:
-                text_pen = QPen(QColor(colors.TEXT_PRIMARY))
+            text_pen = _pen_for(text_color or colors.TEXT_PRIMARY)
         
         # Get font
         font = option.font
@@ -466,23 +909,36 @@ class SpreadsheetDelegate(QStyledItemDelegate):
         painter.setFont(font)
         painter.setPen(text_pen)
         text_rect = option.rect.adjusted(3, 0, -3, 0)  # Add padding
-        # Use item.text() which contains the evaluated result, not the raw formula
-        # Get the item from the table to access the displayed text
-        table = self.parent()
-        if table:
-            item = table.item(index.row(), index.column())
-            display_text = item.text() if item else str(data.get('value', ''))
-        else:
-            display_text = str(data.get('value', ''))
+        # DisplayRole holds the evaluated result, not the raw formula
+        display_text = index.data(Qt.ItemDataRole.DisplayRole) or ''
         painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, display_text)
 
-class Spreadsheet(QTableWidget):
+class Spreadsheet(QTableView):
     DEFERRED_RECALC_ROW_THRESHOLD = 10000
-    DEFERRED_RECALC_SCAN_ROW_CHUNK = 2000
     DEFERRED_RECALC_FORMULA_CHUNK = 1000
+    PASTE_CHUNK_CELLS = 1000
+
+    # QTableWidget-compatible signals, re-emitted from the view/selection model
+    cellClicked = Signal(int, int)
+    currentCellChanged = Signal(int, int, int, int)
+    itemSelectionChanged = Signal()
 
     def __init__(self, parent=None, comment_service=None, comment_number=None):
-        super().__init__(1000, 2, parent)
+        super().__init__(parent)
+        self._model = SpreadsheetModel(1000, 2, self)
+        self.setModel(self._model)
+        self.clicked.connect(lambda index: self.cellClicked.emit(index.row(), index.column()))
+        self.selectionModel().currentChanged.connect(
+            lambda current, previous: self.currentCellChanged.emit(
+                current.row(), current.column(), previous.row(), previous.column()))
+        self.selectionModel().selectionChanged.connect(lambda *_: self.itemSelectionChanged.emit())
+        # The dependency graph and formula cache are keyed by position; move them with the cells
+        model = self._model
+        model.rowsInserted.connect(lambda _, first, last: self._shift_cell_state(0, first, last - first + 1))
+        model.rowsRemoved.connect(lambda _, first, last: self._shift_cell_state(0, first, first - last - 1))
+        model.columnsInserted.connect(lambda _, first, last: self._shift_cell_state(1, first, last - first + 1))
+        model.columnsRemoved.connect(lambda _, first, last: self._shift_cell_state(1, first, first - last - 1))
+        model.modelReset.connect(self._reset_cell_state)
         self.comment_service = comment_service
         self.comment_number = comment_number
         self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
@@ -494,14 +950,22 @@ class Spreadsheet(QTableWidget):
         self.setStyleSheet(stylesheets.get_spreadsheet_stylesheet())
         
         # Dependency Management
-        self.dependents = collections.defaultdict(set) # Key: (row, col), Value: Set of dependent (row, col)
-        self.precedents = collections.defaultdict(set) # Key: (row, col), Value: Set of precedent (row, col)
+        self.dependents = collections.defaultdict(set) # Key: _cell_key(row, col), Value: Set of dependent cell keys
+        self.precedents = collections.defaultdict(set) # Key: _cell_key(row, col), Value: Set of precedent cell keys
         self._evaluating = False # Flag to prevent recursion loops
+        # Per-cell formula cache: (row, col) -> (raw_value, tokens, last_value)
+        self._value_cache = {}
+        # Cells edited since the last recalc, flushed once per event-loop tick
+        self._dirty = set()
+        self._flush_scheduled = False
+        self._parser = FormulaParser(self, None)
+        self._compiler = FormulaCompiler()
         self._updates_deferred = False # Flag for batch operations
+        self._deferred_save_pending = False # Cell edits made while deferred, saved on flush
+        self._paste_chunks = None # Generator of a paste still being streamed in
         self._deferred_start_shape = None
         self._pending_structural_ops = []  # Ordered ops: (action, index, count)
         self._deferred_formula_recalc_scheduled = False
-        self._deferred_recalc_row_cursor = 0
         self._deferred_formula_cells = []
         self._deferred_formula_cursor = 0
         self._deferred_recalc_phase = None
@@ -509,9 +973,17 @@ class Spreadsheet(QTableWidget):
         self._is_dragging_fill_handle = False
         self._drag_start_pos = None
         self._drag_fill_rect = None
+        self._fill_source_range = None # Selection captured when a fill drag starts
         self.highlighted_cells = set()
         self.referenced_cells = []
         self.ref_colors = [QColor(colors.COLOR_REF_BLUE), QColor(colors.COLOR_REF_RED), QColor(colors.COLOR_REF_GREEN), QColor(colors.COLOR_REF_PURPLE)]
+        # Painting resources are built once here rather than on every paintEvent
+        self._ref_pens = [QPen(color, 1, Qt.PenStyle.DashLine) for color in self.ref_colors]
+        self._hover_color = QColor(colors.COLOR_HOVER)
+        self._hover_color.setAlpha(60) # Semi-transparent so text remains visible
+        self._selection_pen = QPen(QColor(colors.COLOR_SELECTION_FILL), 2)
+        self._fill_handle_brush = QBrush(QColor(colors.COLOR_SELECTION_FILL))
+        self._drag_fill_pen = QPen(QColor(colors.BORDER_DARK), 1, Qt.PenStyle.DashLine)
         self.undo_stack = QUndoStack(self)
 
         # --- Formula Hinting Widgets ---
@@ -529,6 +1001,8 @@ class Spreadsheet(QTableWidget):
         self.completer_popup.setStyleSheet(stylesheets.get_completer_popup_stylesheet())
         self.completer_popup.hide()
         self.completer_popup.itemClicked.connect(self.complete_formula)
+        self._completer_prefix = None # Prefix and names the popup rows were built for
+        self._completer_names = []
         # --- End Hinting Widgets ---
         
         # Install event filter on the application to detect focus changes globally
@@ -575,7 +1049,9 @@ class Spreadsheet(QTableWidget):
 
         shape_changed = self._deferred_start_shape != (self.rowCount(), self.columnCount())
         has_pending_structural_ops = bool(self._pending_structural_ops)
+        save_pending = self._deferred_save_pending
         self._deferred_start_shape = None
+        self._deferred_save_pending = False
 
         if has_pending_structural_ops or shape_changed:
             self.update_headers()
@@ -586,6 +1062,8 @@ class Spreadsheet(QTableWidget):
                 self._schedule_deferred_formula_recalc()
             else:
                 self.evaluate_all_cells()
+        elif save_pending:
+            self.save_data_to_service()
 
     def _buffer_structural_op(self, action, index, count=1):
         """Buffer row/column structure changes until deferred mode flush."""
@@ -596,61 +1074,53 @@ class Spreadsheet(QTableWidget):
         if not self._pending_structural_ops:
             return
 
-        self.blockSignals(True)
+        model = self._model
         try:
-            for r in range(self.rowCount()):
-                for c in range(self.columnCount()):
-                    item = self.item(r, c)
-                    if not item:
-                        continue
-
-                    data = item.get_data()
-                    original_formula = str(data.get('value', ''))
-                    if not original_formula.startswith('='):
-                        continue
-
-                    updated_formula = original_formula
-                    for action, index, count in self._pending_structural_ops:
-                        if action == 'add_row':
-                            updated_formula = adjust_formula_references(
-                                updated_formula,
-                                row_offset=count,
-                                col_offset=0,
-                                min_row=index,
-                                min_col=0
-                            )
-                        elif action == 'remove_row':
-                            updated_formula = adjust_formula_references(
-                                updated_formula,
-                                row_offset=-count,
-                                col_offset=0,
-                                min_row=index,
-                                min_col=0,
-                                delete_row=index
-                            )
-                        elif action == 'add_col':
-                            updated_formula = adjust_formula_references(
-                                updated_formula,
-                                row_offset=0,
-                                col_offset=count,
-                                min_row=0,
-                                min_col=index
-                            )
-                        elif action == 'remove_col':
-                            updated_formula = adjust_formula_references(
-                                updated_formula,
-                                row_offset=0,
-                                col_offset=-count,
-                                min_row=0,
-                                min_col=index,
-                                delete_col=index
-                            )
-
-                    if updated_formula != original_formula:
-                        data['value'] = updated_formula
-                        item.set_data(data)
+            for (r, c), original_formula in model.iter_formulas():
+                updated_formula = original_formula
+                for action, index, count in self._pending_structural_ops:
+                    if action == 'add_row':
+                        updated_formula = adjust_formula_references(
+                            updated_formula,
+                            row_offset=count,
+                            col_offset=0,
+                            min_row=index,
+                            min_col=0
+                        )
+                    elif action == 'remove_row':
+                        updated_formula = adjust_formula_references(
+                            updated_formula,
+                            row_offset=-count,
+                            col_offset=0,
+                            min_row=index,
+                            min_col=0,
+                            delete_row=index,
+                            delete_count=count
+                        )
+                    elif action == 'add_col':
+                        updated_formula = adjust_formula_references(
+                            updated_formula,
+                            row_offset=0,
+                            col_offset=count,
+                            min_row=0,
+                            min_col=index
+                        )
+                    elif action == 'remove_col':
+                        updated_formula = adjust_formula_references(
+                            updated_formula,
+                            row_offset=0,
+                            col_offset=-count,
+                            min_row=0,
+                            min_col=index,
+                            delete_col=index,
+                            delete_count=count
+                        )
+
+                if updated_formula != original_formula:
+                    new_data = model.cell(r, c).copy()
+                    new_data['value'] = updated_formula
+                    model.set_cell(r, c, new_data)
         finally:
-            self.blockSignals(False)
             self._pending_structural_ops.clear()
 
     def _schedule_deferred_formula_recalc(self):
@@ -660,12 +1130,10 @@ class Spreadsheet(QTableWidget):
 
         if self.rowCount() < self.DEFERRED_RECALC_ROW_THRESHOLD:
             self.evaluate_all_cells()
-            self.viewport().update()
             return
 
         self._deferred_formula_recalc_scheduled = True
         self._deferred_recalc_phase = 'scan'
-        self._deferred_recalc_row_cursor = 0
         self._deferred_formula_cursor = 0
         self._deferred_formula_cells = []
         self.dependents.clear()
@@ -676,26 +1144,13 @@ class Spreadsheet(QTableWidget):
         """Chunked full-table formula reevaluation for large structural operations."""
         try:
             if self._deferred_recalc_phase == 'scan':
-                row_end = min(
-                    self._deferred_recalc_row_cursor + self.DEFERRED_RECALC_SCAN_ROW_CHUNK,
-                    self.rowCount()
+                # The model indexes formula cells at write time, so the scan
+                # is proportional to the formula count, not rows x columns.
+                model = self._model
+                self._deferred_formula_cells = sorted(
+                    key for key, _ in model.iter_formulas()
                 )
-                for r in range(self._deferred_recalc_row_cursor, row_end):
-                    for c in range(self.columnCount()):
-                        item = self.item(r, c)
-                        if not item:
-                            continue
-                        value = str(item.get_data().get('value', ''))
-                        if value.startswith('='):
-                            self._deferred_formula_cells.append((r, c))
-                        else:
-                            item.setText(value)
-
-                self._deferred_recalc_row_cursor = row_end
-                if self._deferred_recalc_row_cursor < self.rowCount():
-                    QTimer.singleShot(0, self._run_formula_recalc_chunk)
-                    return
-
+                model.prune_display()
                 self._deferred_recalc_phase = 'eval'
 
             eval_end = min(
@@ -714,13 +1169,12 @@ class Spreadsheet(QTableWidget):
             self._deferred_formula_recalc_scheduled = False
             self._deferred_recalc_phase = None
             self._deferred_formula_cells = []
-            self.viewport().update()
+            self._model.notify_all_changed()
         except Exception:
             self._deferred_formula_recalc_scheduled = False
             self._deferred_recalc_phase = None
             self._deferred_formula_cells = []
             self.evaluate_all_cells()
-            self.viewport().update()
 
     def eventFilter(self, obj, event):
         """Global event filter to hide popups when application loses focus."""
@@ -730,6 +1184,68 @@ class Spreadsheet(QTableWidget):
                  self.completer_popup.hide()
         return super().eventFilter(obj, event)
 
+    # --- QTableWidget-compatible API over SpreadsheetModel ---
+
+    def rowCount(self):
+        return self._model.rowCount()
+
+    def columnCount(self):
+        return self._model.columnCount()
+
+    def setRowCount(self, rows):
+        self._model.set_shape(rows, self._model.columnCount())
+
+    def setColumnCount(self, columns):
+        self._model.set_shape(self._model.rowCount(), columns)
+
+    def insertRow(self, row):
+        self._model.insertRows(row, 1)
+
+    def insertColumn(self, column):
+        self._model.insertColumns(column, 1)
+
+    def removeRow(self, row):
+        self._model.removeRows(row, 1)
+
+    def removeColumn(self, column):
+        self._model.removeColumns(column, 1)
+
+    def item(self, row, col):
+        """Returns a SpreadsheetItem handle for an in-range cell, or None."""
+        if not (0 <= row < self._model.rowCount() and 0 <= col < self._model.columnCount()):
+            return None
+        item = SpreadsheetItem()
+        item._bind(self._model, row, col)
+        return item
+
+    def setItem(self, row, col, item):
+        """Binds `item` to the cell, storing any data it carried while detached."""
+        data = item.get_data()
+        item._bind(self._model, row, col)
+        self._model.set_cell(row, col, data)
+        self._model.notify_cells_changed(row, col, row, col)
+
+    def currentRow(self):
+        return self.currentIndex().row()
+
+    def currentColumn(self):
+        return self.currentIndex().column()
+
+    def currentItem(self):
+        index = self.currentIndex()
+        return self.item(index.row(), index.column()) if index.isValid() else None
+
+    def setCurrentCell(self, row, col):
+        self.setCurrentIndex(self._model.index(row, col))
+
+    def selectedItems(self):
+        return [self.item(index.row(), index.column()) for index in self.selectedIndexes()
+                if self._model.has_cell(index.row(), index.column())]
+
+    def selectedRanges(self):
+        return [QTableWidgetSelectionRange(r.top(), r.left(), r.bottom(), r.right())
+                for r in self.selectionModel().selection()]
+
     # --- New Helper Methods to Fix AttributeError ---
     def isColumnSelected(self, column):
         """Check if the entire column is selected."""
@@ -786,280 +1302,463 @@ class Spreadsheet(QTableWidget):
         """
         Called by FormulaParser when 'dependent_cell' reads 'precedent_cell'.
         """
-        self.precedents[dependent_cell].add(precedent_cell)
-        self.dependents[precedent_cell].add(dependent_cell)
+        row, col = precedent_cell
+        if row < 0 or not 0 <= col < _CELL_KEY_STRIDE:
+            return  # Out-of-sheet reference; no cell can ever change it
+        dependent = _cell_key(*dependent_cell)
+        precedent = row * _CELL_KEY_STRIDE + col
+        self.precedents[dependent].add(precedent)
+        self.dependents[precedent].add(dependent)
+
+    def _shift_cell_state(self, axis, index, delta):
+        """Moves dependency edges and cached formulas along with a row/column insert or removal."""
+        def moved(keys):
+            shifted = (_shift_cell_key(key, axis, index, delta) for key in keys)
+            return {key for key in shifted if key is not None}
+
+        for name in ('dependents', 'precedents'):
+            graph = collections.defaultdict(set)
+            for key, linked in getattr(self, name).items():
+                key = _shift_cell_key(key, axis, index, delta)
+                if key is not None:
+                    graph[key] = moved(linked)
+            setattr(self, name, graph)
+        self._value_cache = _shift_cell_keys(self._value_cache, axis, index, delta)
+        self._dirty = set(_shift_cell_keys(dict.fromkeys(self._dirty), axis, index, delta))
+
+    def _reset_cell_state(self):
+        self.dependents.clear()
+        self.precedents.clear()
+        self._value_cache.clear()
+        self._dirty.clear()
 
     def clear_dependencies(self, cell):
         """Clears outgoing dependencies for a cell before re-parsing."""
-        if cell in self.precedents:
-            for prec in self.precedents[cell]:
-                if cell in self.dependents[prec]:
-                    self.dependents[prec].remove(cell)
-            del self.precedents[cell]
+        key = _cell_key(*cell)
+        precedents = self.precedents.pop(key, None)
+        if precedents:
+            dependents = self.dependents
+            for prec in precedents:
+                linked = dependents.get(prec)
+                if linked is not None:
+                    linked.discard(key)
 
     def evaluate_cell(self, row, col, propagate=True):
         """
         Evaluates a specific cell, updates the graph, and optionally propagates updates.
+
+        Returns True if the shown result changed; dependents of a cell whose result
+        is unchanged are not revisited.
         """
-        item = self.item(row, col)
-        if not item: return
+        model = self._model
+        if not model.has_cell(row, col): return False
 
-        data = item.get_data()
-        raw_value = str(data.get('value', ''))
+        raw_value = model.formula(row, col)
         
-        if raw_value.startswith('='):
+        if raw_value is not None:
             cell_coords = (row, col)
             # 1. Clear old dependencies
             self.clear_dependencies(cell_coords)
             
-            # 2. Parse and Evaluate
+            # 2. Parse (reusing the cached tokens while the formula is unchanged) and Evaluate
+            parser = self._parser
+            parser.current_cell = cell_coords
+            cached = self._value_cache.get(cell_coords)
+            tokens = cached[1] if cached and cached[0] == raw_value else None
+            try:
+                if tokens is None:
+                    tokens = parser.parse(raw_value[1:])
+                result = self._compiler.evaluate(parser, tokens)
+            except Exception as e:
+                result = f"#ERROR: {str(e)}"
             try:
-                # Pass self (Spreadsheet) as the table interface
-                parser = FormulaParser(self, cell_coords) 
-                result = parser.evaluate(raw_value[1:])
-                
                 # Format Result
-                if isinstance(result, bool): item.setText(str(result).upper())
-                elif isinstance(result, float) and result.is_integer(): item.setText(str(int(result)))
-                else: item.setText(f"{result:.2f}" if isinstance(result, float) else str(result))
+                text = _RESULT_FORMATTERS.get(type(result), str)(result)
             except Exception:
-                item.setText("#ERROR")
+                text = "#ERROR"
+            changed = model.set_display(row, col, text)
+            try: value = float(text)
+            except ValueError: value = text
+            self._value_cache[cell_coords] = (raw_value, tokens, value)
         else:
-            # If it's not a formula, just show text
+            # If it's not a formula, the model displays the raw value
             # Also clear dependencies because it's no longer a formula
             self.clear_dependencies((row, col))
-            item.setText(raw_value)
+            self._value_cache.pop((row, col), None)
+            model.clear_display(row, col)
+            changed = True
 
-        # 3. Propagate to dependents
-        if propagate and (row, col) in self.dependents:
+        # 3. Propagate to dependents, unless nothing they read has changed
+        key = _cell_key(row, col)
+        if propagate and changed and key in self.dependents:
             # Create a copy of the set to avoid "Set changed size during iteration" error
             # when recursive calls modify the dependents set
-            for dep_row, dep_col in list(self.dependents[(row, col)]):
-                self.evaluate_cell(dep_row, dep_col, propagate=True)
+            for dep in list(self.dependents[key]):
+                self.evaluate_cell(*_cell_pos(dep), propagate=True)
+        return changed
 
     def evaluate_all_cells(self):
         """
-        Evaluates all cells using Topological Sort to handle dependencies efficiently.
+        Evaluates all formula cells exactly once, in dependency order (Kahn's algorithm).
+
+        Formulas are first scanned for references without being evaluated. Cells
+        that are still blocked once the queue drains sit on (or behind) a
+        circular reference and are marked #CYCLE.
         """
-        # 1. Clear all dependencies and rebuild graph from scratch
+        # Clear all dependencies; evaluate_cell rebuilds them as it goes
         self.dependents.clear()
         self.precedents.clear()
+        # A full pass supersedes any queued incremental recalc
+        self._dirty.clear()
 
-        # 2. First pass: Parse all formulas to build the dependency graph (without evaluating values yet if possible, 
-        #    but simplest is just to eval). 
-        #    However, to avoid double work, we can just queue cells.
-        
-        cells_with_formulas = []
-        for r in range(self.rowCount()):
-            for c in range(self.columnCount()):
-                item = self.item(r, c)
-                if item and str(item.get_data().get('value', '')).startswith('='):
-                    cells_with_formulas.append((r, c))
-                elif item:
-                    item.setText(str(item.get_data().get('value', '')))
-
-        # 3. Evaluation Loop (Simple approach with cycle detection)
-        # A true topological sort is better, but just evaluating standard cells first then formulas works often.
-        # Given the circular ref possibility, we'll just call evaluate_cell.
-        # To prevent infinite recursion during init, we rely on the parser.
-        
-        # Better approach: Just evaluate everything. The recursion in `evaluate_cell` 
-        # handles the order if we trigger it. But efficient way is:
-        # Evaluate cells with NO formulas first (done above).
-        # Then evaluate cells with formulas.
-        for r, c in cells_with_formulas:
-            self.evaluate_cell(r, c, propagate=False) 
-            # propagate=False because we are iterating everyone anyway, 
-            # though correct order matters.
-            
-        # Refined Approach: 
-        # To ensure correct order (A1 before B1 if B1=A1), we need to resolve deps.
-        # Since we cleared deps, we let `evaluate_cell` rebuild them.
-        # We might calculate a cell twice if we are not careful, but that's safer than O(N^2).
-        pass
+        # Non-formula cells display their raw value, so only formulas need a pass.
+        model = self._model
+        model.clear_all_display()
+        formulas = {key: formula[1:] for key, formula in model.iter_formulas()}
+
+        # Keep cached tokens only for cells that are still formulas
+        self._value_cache = {key: entry for key, entry in self._value_cache.items() if key in formulas}
+
+        self._evaluate_in_order(formulas)
+        model.notify_all_changed()
+
+    def _schedule_recalc(self):
+        """Queues a single recalc of the dirty cells for the next event-loop tick."""
+        if self._flush_scheduled:
+            return
+        self._flush_scheduled = True
+        QTimer.singleShot(0, self._flush_recalc)
+
+    def _flush_recalc(self):
+        self._flush_scheduled = False
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        self.evaluate_subset(dirty)
+
+    def flush_now(self):
+        """Runs any queued recalc immediately, e.g. before reading displayed results."""
+        self._flush_recalc()
+
+    def evaluate_subset(self, cells):
+        """
+        Re-evaluates `cells` and everything downstream of them, each exactly once.
+
+        Used after structural edits and restores so only the formulas whose text
+        or inputs changed are recomputed instead of the whole sheet. A downstream
+        formula is skipped when none of the cells it reads produced a new result.
+        """
+        if not cells:
+            return
+        # 1. Transitive closure over the dependency graph
+        dependents = self.dependents
+        roots = {_cell_key(r, c) for r, c in cells}
+        dirty = set(roots)
+        queue = collections.deque(dirty)
+        while queue:
+            for dependent in dependents.get(queue.popleft(), ()):
+                if dependent not in dirty:
+                    dirty.add(dependent)
+                    queue.append(dependent)
+
+        # 2. Plain cells just drop stale state; formulas are ordered among themselves
+        model = self._model
+        formulas = {}
+        changed = set()
+        for key in dirty:
+            r, c = _cell_pos(key)
+            formula = model.formula(r, c)
+            if formula is not None:
+                formulas[(r, c)] = formula[1:]
+            else:
+                self.evaluate_cell(r, c, propagate=False)
+                changed.add(key)
+        self._evaluate_in_order(formulas, roots, changed)
+
+        # 3. One dataChanged over the cells whose shown result actually changed
+        if changed:
+            rows, cols = zip(*map(_cell_pos, changed))
+            model.notify_cells_changed(min(rows), min(cols), max(rows), max(cols))
+
+    def _evaluate_in_order(self, formulas, roots=None, changed=None):
+        """
+        Evaluates {(row, col): expression} once per cell in dependency order (Kahn's
+        algorithm), reading any formula outside `formulas` at its current value.
+
+        When `roots` (cell keys) is given, other cells are only evaluated if one of
+        their precedents is in `changed`, which collects the keys of cells whose
+        result changed along the way.
+        """
+        # Collect formula-to-formula edges without evaluating anything
+        in_degree = dict.fromkeys(formulas, 0)
+        formula_dependents = collections.defaultdict(list)
+        static_refs = {}
+        for cell, expression in formulas.items():
+            try:
+                refs = static_refs[cell] = self._parser.references(expression)
+            except Exception:
+                continue  # Tokenizer errors surface as #ERROR on evaluation
+            for ref in refs:
+                if ref in in_degree:
+                    in_degree[cell] += 1
+                    formula_dependents[ref].append(cell)
+
+        # Evaluate each cell once all of its formula precedents are done
+        ready = collections.deque(cell for cell, degree in in_degree.items() if degree == 0)
+        precedents = self.precedents
+        while ready:
+            cell = ready.popleft()
+            if roots is None:
+                self.evaluate_cell(*cell, propagate=False)
+            else:
+                key = _cell_key(*cell)
+                if key in roots or not changed.isdisjoint(precedents.get(key, ())):
+                    if self.evaluate_cell(*cell, propagate=False):
+                        changed.add(key)
+            for dependent in formula_dependents.get(cell, ()):
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    ready.append(dependent)
+
+        model = self._model
+        for cell, degree in in_degree.items():
+            if degree > 0:
+                # Never evaluated, so record its references for later dirty-set walks
+                self.clear_dependencies(cell)
+                for ref in static_refs[cell]:
+                    self.add_dependency(cell, ref)
+                self._value_cache.pop(cell, None)
+                if model.set_display(*cell, "#CYCLE") and changed is not None:
+                    changed.add(_cell_key(*cell))
 
     # --- Data Operations ---
 
     def get_cell_value(self, row, col):
-        item = self.item(row, col)
-        if not item: return 0
-        text = item.text()
+        cached = self._value_cache.get((row, col))
+        if cached is not None: return cached[2]
+        if not self._model.has_cell(row, col): return 0
+        text = self._model.display_text(row, col)
         try: return float(text)
         except: return text
 
     def apply_changes(self, changes):
         """Applies a batch of cell changes and triggers updates."""
-        self.blockSignals(True)
+        model = self._model
         affected_cells = []
         for row, col, _, new_data in changes:
-            item = self.item(row, col)
-            if not item:
-                item = SpreadsheetItem()
-                self.setItem(row, col, item)
-            item.set_data(new_data)
+            model.set_cell(row, col, new_data)
             affected_cells.append((row, col))
-        self.blockSignals(False)
-        
-        for r, c in affected_cells:
-            self.evaluate_cell(r, c)
-            
-        self.viewport().update()
-        self.save_data_to_service()
+
+        if affected_cells:
+            rows = [r for r, _ in affected_cells]
+            cols = [c for _, c in affected_cells]
+            model.notify_cells_changed(min(rows), min(cols), max(rows), max(cols))
+            # Formulas are recomputed once per event-loop tick, however many edits land in it
+            self._dirty.update(affected_cells)
+            self._schedule_recalc()
+        if self._updates_deferred:
+            self._deferred_save_pending = True
+        else:
+            self.save_data_to_service()
+
+    def apply_cell_patch(self, key_path, values):
+        """Sets key_path to each (row, col, value), copying only the dicts on that path."""
+        model = self._model
+        changes = []
+        for row, col, value in values:
+            # Fresh dicts along the path; cells may share nested dicts with undo history
+            data = dict(model.cell(row, col) or {'value': ''})
+            target = data
+            parents = []
+            for key in key_path[:-1]:
+                nested = dict(target.get(key) or {})
+                target[key] = nested
+                parents.append((target, key))
+                target = nested
+            if value is _UNSET:
+                target.pop(key_path[-1], None)
+                # Drop the dicts this path created, so undo restores the cell exactly
+                for parent, key in reversed(parents):
+                    if parent[key]:
+                        break
+                    del parent[key]
+            else:
+                target[key_path[-1]] = value
+            changes.append((row, col, None, data))
+        self.apply_changes(changes)
 
     def perform_insert(self, action, index, count=1):
-        self.blockSignals(True)
+        dirty = set()
         if action == 'add_row':
-            for _ in range(count):
-                self.insertRow(index)
+            self._model.insertRows(index, count)
             if self._updates_deferred:
                 self._buffer_structural_op('add_row', index, count)
             else:
-                self.shift_formulas_for_insert_delete(row_threshold=index, row_shift=count)
+                dirty = self.shift_formulas_for_insert_delete(row_threshold=index, row_shift=count)
         elif action == 'add_col':
-            for _ in range(count):
-                self.insertColumn(index)
+            self._model.insertColumns(index, count)
             if self._updates_deferred:
                 self._buffer_structural_op('add_col', index, count)
             else:
-                self.shift_formulas_for_insert_delete(col_threshold=index, col_shift=count)
-        
-        self.blockSignals(False)
+                dirty = self.shift_formulas_for_insert_delete(col_threshold=index, col_shift=count)
         
         if not self._updates_deferred:
             self.update_headers()
             self.save_data_to_service()
-            self.evaluate_all_cells()
+            self.evaluate_subset(dirty)
 
-    def perform_remove(self, action, index):
-        self.blockSignals(True)
+    def perform_remove(self, action, index, count=1):
+        model = self._model
         saved_data = []
+        dirty = set()
         
         if action == 'remove_row':
-            # Save data for undo
-            for c in range(self.columnCount()):
-                item = self.item(index, c)
-                saved_data.append(item.get_data() if item else {'value': ''})
-            self.removeRow(index)
+            # Save data for undo, one list per removed row; empty cells stay None
+            saved_data = [model.row_cells(r) for r in range(index, index + count)]
+            model.removeRows(index, count)
             if self._updates_deferred:
-                self._buffer_structural_op('remove_row', index, 1)
+                self._buffer_structural_op('remove_row', index, count)
             else:
-                self.shift_formulas_for_insert_delete(row_threshold=index, row_shift=-1, deleted_row=index)
+                dirty = self.shift_formulas_for_insert_delete(row_threshold=index, row_shift=-count, deleted_row=index, deleted_count=count)
             
         elif action == 'remove_col':
-            for r in range(self.rowCount()):
-                item = self.item(r, index)
-                saved_data.append(item.get_data() if item else {'value': ''})
-            self.removeColumn(index)
+            saved_data = [model.column_cells(c) for c in range(index, index + count)]
+            model.removeColumns(index, count)
             if self._updates_deferred:
-                self._buffer_structural_op('remove_col', index, 1)
+                self._buffer_structural_op('remove_col', index, count)
             else:
-                self.shift_formulas_for_insert_delete(col_threshold=index, col_shift=-1, deleted_col=index)
-
-        self.blockSignals(False)
+                dirty = self.shift_formulas_for_insert_delete(col_threshold=index, col_shift=-count, deleted_col=index, deleted_count=count)
         
         if not self._updates_deferred:
             self.update_headers()
             self.save_data_to_service()
-            self.evaluate_all_cells()
+            self.evaluate_subset(dirty)
         return saved_data
 
     def perform_insert_with_restore(self, action, index, saved_data):
-        # Used for undoing a delete
-        self.perform_insert(action, index, 1) # This handles the shift
+        # Used for undoing a delete; saved_data holds one list per removed row/column
+        self.perform_insert(action, index, len(saved_data)) # This handles the shift
         # Now restore data
-        self.blockSignals(True)
+        model = self._model
         if action == 'add_row':
-            for c, data in enumerate(saved_data):
-                item = self.item(index, c)
-                if not item: 
-                    item = SpreadsheetItem()
-                    self.setItem(index, c, item)
-                item.set_data(data)
+            restored = {(index + i, c): data for i, line in enumerate(saved_data)
+                        for c, data in enumerate(line) if data is not None}
         elif action == 'add_col':
-             for r, data in enumerate(saved_data):
-                item = self.item(r, index)
-                if not item: 
-                    item = SpreadsheetItem()
-                    self.setItem(r, index, item)
-                item.set_data(data)
-        self.blockSignals(False)
+            restored = {(r, index + i): data for i, line in enumerate(saved_data)
+                        for r, data in enumerate(line) if data is not None}
+        else:
+            restored = {}
+        for (r, c), data in restored.items():
+            model.set_cell(r, c, data)
+        if restored:
+            rows = [r for r, _ in restored]
+            cols = [c for _, c in restored]
+            model.notify_cells_changed(min(rows), min(cols), max(rows), max(cols))
         
         if not self._updates_deferred:
             self.save_data_to_service()
-            self.evaluate_all_cells()
+            self.evaluate_subset(restored)
 
-    def shift_formulas_for_insert_delete(self, row_threshold=0, col_threshold=0, row_shift=0, col_shift=0, deleted_row=-1, deleted_col=-1):
+    def shift_formulas_for_insert_delete(self, row_threshold=0, col_threshold=0, row_shift=0, col_shift=0, deleted_row=-1, deleted_col=-1, deleted_count=1):
         """
-        Iterates over all cells and updates formulas to point to new locations.
+        Iterates over the formula cells and updates them to point to new locations.
+        Returns the set of cells whose formula text changed.
         """
-        for r in range(self.rowCount()):
-            for c in range(self.columnCount()):
-                item = self.item(r, c)
-                if not item: continue
-                
-                data = item.get_data()
-                val = str(data.get('value', ''))
-                
-                if val.startswith('='):
-                    new_formula = adjust_formula_references(
-                        val, 
-                        row_offset=row_shift, 
-                        col_offset=col_shift, 
-                        min_row=row_threshold, 
-                        min_col=col_threshold,
-                        delete_row=deleted_row,
-                        delete_col=deleted_col
-                    )
-                    if new_formula != val:
-                        data['value'] = new_formula
-                        item.set_data(data)
+        model = self._model
+        changed = set()
+        for (r, c), val in model.iter_formulas():
+            new_formula = adjust_formula_references(
+                val, 
+                row_offset=row_shift, 
+                col_offset=col_shift, 
+                min_row=row_threshold, 
+                min_col=col_threshold,
+                delete_row=deleted_row,
+                delete_col=deleted_col,
+                delete_count=deleted_count
+            )
+            if new_formula != val:
+                new_data = model.cell(r, c).copy()
+                new_data['value'] = new_formula
+                model.set_cell(r, c, new_data)
+                changed.add((r, c))
+        return changed
 
     def paste(self):
+        self._finish_paste()
         selection = self.selectedRanges()
         if not selection: return
         start_row, start_col = selection[0].topRow(), selection[0].leftColumn()
 
         clipboard_text = QApplication.clipboard().text()
-        rows = clipboard_text.strip('\n').split('\n')
+        # Clip the pasted block to the table once instead of bounds-checking every cell
+        rows = clipboard_text.strip('\n').split('\n')[:max(0, self.rowCount() - start_row)]
+        max_cols = max(0, self.columnCount() - start_col)
+        matrix = [row_text.split('\t')[:max_cols] for row_text in rows]
+
+        # Intelligent Paste: Adjust relative references.
+        # Standard text clipboard doesn't hold source coordinates, so internal copies
+        # record them in EditService; look that up once for the whole paste.
+        from services.edit_service import ClipboardDataType
+        clipboard_data, clipboard_type, _ = self.parent().main_window.edit_service.get_clipboard()
+        source = None
+        if clipboard_type == ClipboardDataType.TABLE_CELLS and clipboard_data and 'is_spreadsheet' in clipboard_data:
+            source = clipboard_data
+
+        chunks = self._paste_iter(matrix, start_row, start_col, source)
+        first = next(chunks, None)
+        if first is None:
+            return
+        if sum(len(cols) for cols in matrix) <= self.PASTE_CHUNK_CELLS:
+            self.undo_stack.push(ChangeCellCommand(self, first, "Paste"))
+            return
+
+        # Large pastes land a chunk per event-loop tick (the top rows, usually the
+        # visible ones, first) inside one undo macro, saving once at the end.
+        self.undo_stack.beginMacro("Paste")
+        self.set_updates_deferred(True)
+        self.undo_stack.push(ChangeCellCommand(self, first, "Paste"))
+        self._paste_chunks = chunks
+        QTimer.singleShot(0, self._paste_next_chunk)
+
+    def _paste_iter(self, matrix, start_row, start_col, source):
+        """Yields paste changes in row-aligned chunks of about PASTE_CHUNK_CELLS cells."""
+        model = self._model
         changes = []
-        
-        for r_idx, row_text in enumerate(rows):
-            cols = row_text.split('\t')
+        for r_idx, cols in enumerate(matrix):
+            target_row = start_row + r_idx
             for c_idx, val in enumerate(cols):
-                target_row, target_col = start_row + r_idx, start_col + c_idx
-                if target_row < self.rowCount() and target_col < self.columnCount():
-                    item = self.item(target_row, target_col)
-                    old_data = item.get_data() if item else {'value': ''}
-                    new_data = old_data.copy()
-                    
-                    # Intelligent Paste: Adjust relative references
-                    # We assume the copy source was (0,0) relative to the clipboard structure
-                    # This is a simplification. A full Excel clone stores source coords in clipboard.
-                    # For now, we just set value. Real relative paste requires knowing source indices.
-                    # Assuming simple text paste for now, but if it looks like formula, we paste as is?
-                    # Problem: "Relative Reference Adjustment on Paste" requested.
-                    # Limitation: Standard text clipboard doesn't hold source coordinates.
-                    # Solution: Use EditService for internal copy to track source row/col.
-                    
-                    from services.edit_service import ClipboardDataType
-                    clipboard_data, clipboard_type, _ = self.parent().main_window.edit_service.get_clipboard()
-                    if clipboard_type == ClipboardDataType.TABLE_CELLS and clipboard_data and 'is_spreadsheet' in clipboard_data:
-                        source_data = clipboard_data
-                        # Use internal logic if available
-                        src_r = source_data['start_row'] + r_idx
-                        src_c = source_data['start_col'] + c_idx
-                        # Calculate offset
-                        row_offset = target_row - src_r
-                        col_offset = target_col - src_c
-                        
-                        if val.startswith('='):
-                            val = adjust_formula_references(val, row_offset, col_offset)
-
-                    new_data['value'] = val
-                    changes.append((target_row, target_col, old_data, new_data))
-
+                target_col = start_col + c_idx
+                if source is not None and val.startswith('='):
+                    # Offset relative to where the copied cell came from
+                    row_offset = target_row - (source['start_row'] + r_idx)
+                    col_offset = target_col - (source['start_col'] + c_idx)
+                    val = adjust_formula_references(val, row_offset, col_offset)
+                old_data = model.cell(target_row, target_col) or {'value': ''}
+                changes.append((target_row, target_col, old_data, {**old_data, 'value': val}))
+            if len(changes) >= self.PASTE_CHUNK_CELLS:
+                yield changes
+                changes = []
         if changes:
-            self.undo_stack.push(ChangeCellCommand(self, changes, "Paste"))
+            yield changes
+
+    def _paste_next_chunk(self):
+        chunks = self._paste_chunks
+        if chunks is None:
+            return
+        changes = next(chunks, None)
+        if changes is None:
+            self._paste_chunks = None
+            self.set_updates_deferred(False)
+            self.undo_stack.endMacro()
+            return
+        self.undo_stack.push(ChangeCellCommand(self, changes, "Paste"))
+        QTimer.singleShot(0, self._paste_next_chunk)
+
+    def _finish_paste(self):
+        """Applies what is left of a streamed paste so its macro closes before other edits."""
+        while self._paste_chunks is not None:
+            self._paste_next_chunk()
 
     def copy(self):
         selection = self.selectedRanges()
@@ -1075,14 +1774,13 @@ class Spreadsheet(QTableWidget):
             'start_col': c1
         }, ClipboardDataType.TABLE_CELLS)
         
-        text = ""
+        # Read the model directly and join once; repeated += is quadratic in text size
+        cell_of = self._model.cell
+        rows = []
         for r in range(r1, r2 + 1):
-            row_data = []
-            for c in range(c1, c2 + 1):
-                item = self.item(r, c)
-                row_data.append(str(item.get_data().get('value', '')) if item else "")
-            text += "\t".join(row_data) + "\n"
-        QApplication.clipboard().setText(text)
+            row_cells = (cell_of(r, c) for c in range(c1, c2 + 1))
+            rows.append("\t".join(str(cell.get('value', '')) if cell else "" for cell in row_cells))
+        QApplication.clipboard().setText("\n".join(rows) + "\n")
 
     def cut(self):
         self.copy()
@@ -1091,25 +1789,31 @@ class Spreadsheet(QTableWidget):
     def delete(self):
         selection = self.selectedRanges()
         if not selection: return
-        changes = []
-        for r in selection:
-            for row in range(r.topRow(), r.bottomRow() + 1):
-                for col in range(r.leftColumn(), r.rightColumn() + 1):
-                    item = self.item(row, col)
-                    if item and item.get_data().get('value'):
-                        old = item.get_data()
-                        new = old.copy()
-                        new['value'] = ''
-                        changes.append((row, col, old, new))
-        if changes:
-            self.undo_stack.push(ChangeCellCommand(self, changes, "Delete"))
+        patches = self._clear_value_patches(
+            (r.topRow(), r.leftColumn(), r.bottomRow(), r.rightColumn()) for r in selection
+        )
+        if patches:
+            self.undo_stack.push(CellPatchCommand(self, ('value',), patches, "Delete"))
+
+    def _clear_value_patches(self, rects):
+        """Builds value patches blanking every non-empty stored cell in the rectangles."""
+        model = self._model
+        patches = []
+        for top, left, bottom, right in rects:
+            for (row, col), old in model.cells_in(top, left, bottom, right):
+                value = old.get('value')
+                if value:
+                    patches.append((row, col, value, ''))
+        return patches
     
     def undo(self):
+        self._finish_paste()
         self.set_updates_deferred(True)
         self.undo_stack.undo()
         self.set_updates_deferred(False)
 
     def redo(self):
+        self._finish_paste()
         self.set_updates_deferred(True)
         self.undo_stack.redo()
         self.set_updates_deferred(False)
@@ -1119,41 +1823,30 @@ class Spreadsheet(QTableWidget):
         table_data = self.comment_service.get_table_data(self.comment_number)
         if not table_data: return
 
-        self.setRowCount(len(table_data))
-        self.setColumnCount(len(table_data[0]) if table_data else 0)
-        self.update_headers()
-
-        self.blockSignals(True)
-        for r, row in enumerate(table_data):
-            for c, cell_data in enumerate(row):
-                item = self.item(r, c) or SpreadsheetItem()
-                self.setItem(r, c, item)
-                item.set_data(cell_data)
-        self.blockSignals(False)
+        # One model reset refreshes cells and headers, instead of row/column inserts
+        self._model.load(table_data)
         self.evaluate_all_cells()
 
     def save_data_to_service(self):
         if not self.comment_service: return
-        data = []
-        for r in range(self.rowCount()):
-            row_d = []
-            for c in range(self.columnCount()):
-                item = self.item(r, c)
-                row_d.append(item.get_data() if item else {'value': ''})
-            data.append(row_d)
+        data = self._model.snapshot()
         self.comment_service.update_table_data(self.comment_number, data)
         parent_widget = self.parent()
         if parent_widget and hasattr(parent_widget, 'main_window') and hasattr(parent_widget.main_window, 'project_service'):
             parent_widget.main_window.project_service.mark_as_unsaved()
 
     def update_headers(self):
-        self.setHorizontalHeaderLabels([col_int_to_str(i) for i in range(self.columnCount())])
-        self.setVerticalHeaderLabels([str(i+1) for i in range(self.rowCount())])
+        # Labels come from SpreadsheetModel.headerData; just ask the headers to refresh
+        if self.columnCount():
+            self._model.headerDataChanged.emit(Qt.Orientation.Horizontal, 0, self.columnCount() - 1)
+        if self.rowCount():
+            self._model.headerDataChanged.emit(Qt.Orientation.Vertical, 0, self.rowCount() - 1)
 
     def get_cell_ref_str(self, row, col):
-        return f"{col_int_to_str(col)}{row + 1}"
+        return f"{_column_label(col)}{row + 1}"
 
     def add_column(self):
+        self._finish_paste()
         # Insert at current selection if available, else insert BEFORE current index
         selected_cols = self.selectedRanges()
         count = 0
@@ -1180,6 +1873,7 @@ class Spreadsheet(QTableWidget):
             self.undo_stack.push(ResizeCommand(self, 'add_col', idx, count))
 
     def add_row(self):
+        self._finish_paste()
         # Insert at current selection if available, else insert BEFORE current index
         selected_rows = self.selectedRanges()
         count = 0
@@ -1201,74 +1895,62 @@ class Spreadsheet(QTableWidget):
             
         self.undo_stack.push(ResizeCommand(self, 'add_row', idx, count))
 
-    def remove_column(self, index=None):
-        # FIX: Ensure index is strictly an int and not bool (from signal)
-        # Signals send 'False' which is 0, causing column 0 deletion on simple button click
-        target_index = None
-        if index is not None and type(index) is int:
-            target_index = index
-            
-        cols_to_remove = set()
-        
-        if target_index is not None:
-             # Context menu deletion
-             # If the target column is part of a multi-column selection, delete all selected
-             # Otherwise just delete the target
-             selection_model = self.selectionModel()
-             if selection_model and selection_model.isColumnSelected(target_index, self.rootIndex()):
-                 for r in self.selectedRanges():
-                     for c in range(r.leftColumn(), r.rightColumn() + 1):
-                         cols_to_remove.add(c)
-             else:
-                 cols_to_remove.add(target_index)
+    def _removal_spans(self, axis, index):
+        """
+        Returns inclusive (first, last) spans of the rows (axis 0) or columns
+        (axis 1) to delete. An int `index` is a context-menu target; anything else
+        means a button/shortcut deletion of the current selection.
+        """
+        ranges = self.selectedRanges()
+        if axis == 0:
+            extents = [(r.topRow(), r.bottomRow(), r.leftColumn(), r.rightColumn()) for r in ranges]
+            cross_last = self.columnCount() - 1
         else:
-            # Button/Shortcut deletion
-            # Use current selection
-            for r in self.selectedRanges():
-                 for c in range(r.leftColumn(), r.rightColumn() + 1):
-                     cols_to_remove.add(c)
-            
-            # If nothing selected (e.g. just a single cell focus), delete that column
-            if not cols_to_remove and self.currentColumn() >= 0:
-                 cols_to_remove.add(self.currentColumn())
+            extents = [(r.leftColumn(), r.rightColumn(), r.topRow(), r.bottomRow()) for r in ranges]
+            cross_last = self.rowCount() - 1
+        spans = [(first, last) for first, last, _, _ in extents]
+
+        # FIX: Signals send 'False', which is 0 and would delete the first row/column
+        if isinstance(index, int) and not isinstance(index, bool):
+            # If the target is part of a wholly selected multi-line selection, delete
+            # all selected; otherwise just the target. The ranges answer this without
+            # probing the selection model in the common cases.
+            containing = [e for e in extents if e[0] <= index <= e[1]]
+            if not containing:
+                return [(index, index)]
+            if any(e[2] == 0 and e[3] >= cross_last for e in containing):
+                return spans
+            selection_model = self.selectionModel()
+            is_selected = selection_model.isRowSelected if axis == 0 else selection_model.isColumnSelected
+            return spans if is_selected(index, self.rootIndex()) else [(index, index)]
+
+        # If nothing selected (e.g. just a single cell focus), delete the current line
+        if not spans:
+            current = self.currentRow() if axis == 0 else self.currentColumn()
+            if current >= 0:
+                spans = [(current, current)]
+        return spans
 
-        sorted_cols = sorted(list(cols_to_remove), reverse=True)
+    def remove_column(self, index=None):
+        self._finish_paste()
+        spans = self._removal_spans(1, index)
+        sorted_cols = _collect_indices(spans, self.columnCount())
         if not sorted_cols: return
 
         self.set_updates_deferred(True)
         self.undo_stack.beginMacro("Delete Columns")
         try:
-            for c in sorted_cols:
-                if self.columnCount() > 0:
-                    self.undo_stack.push(ResizeCommand(self, 'remove_col', c))
+            # One command per contiguous run, highest first, so earlier indices stay valid
+            for start, count in _index_runs(sorted_cols):
+                self.undo_stack.push(ResizeCommand(self, 'remove_col', start, count))
         finally:
             self.undo_stack.endMacro()
             self.set_updates_deferred(False)
 
     def remove_row(self, index=None):
-        # FIX: Ensure index is strictly an int and not bool (from signal)
-        target_index = None
-        if index is not None and type(index) is int:
-            target_index = index
-
-        rows_to_remove = set()
-        
-        if target_index is not None:
-             selection_model = self.selectionModel()
-             if selection_model and selection_model.isRowSelected(target_index, self.rootIndex()):
-                 for r in self.selectedRanges():
-                     for row in range(r.topRow(), r.bottomRow() + 1):
-                         rows_to_remove.add(row)
-             else:
-                 rows_to_remove.add(target_index)
-        else:
-            for r in self.selectedRanges():
-                 for row in range(r.topRow(), r.bottomRow() + 1):
-                     rows_to_remove.add(row)
-            if not rows_to_remove and self.currentRow() >= 0:
-                 rows_to_remove.add(self.currentRow())
-
-        sorted_rows = sorted(list(rows_to_remove), reverse=True)
+        self._finish_paste()
+        spans = self._removal_spans(0, index)
+        sorted_rows = _collect_indices(spans, self.rowCount())
         if not sorted_rows: return
 
         # Use optimized batch deletion for large operations
@@ -1279,14 +1961,14 @@ class Spreadsheet(QTableWidget):
             self.set_updates_deferred(True)
             self.undo_stack.beginMacro("Delete Rows")
             try:
-                for r in sorted_rows:
-                    if self.rowCount() > 0:
-                        self.undo_stack.push(ResizeCommand(self, 'remove_row', r))
+                for start, count in _index_runs(sorted_rows):
+                    self.undo_stack.push(ResizeCommand(self, 'remove_row', start, count))
             finally:
                 self.undo_stack.endMacro()
                 self.set_updates_deferred(False)
 
     def insert_column(self, index):
+        self._finish_paste()
         # Context menu insert - show dialog to ask how many columns
         dialog = InsertQuantityDialog(mode='column', current_count=self.columnCount(), parent=self)
         if dialog.exec() != QDialog.DialogCode.Accepted:
@@ -1303,6 +1985,7 @@ class Spreadsheet(QTableWidget):
         self.undo_stack.push(ResizeCommand(self, 'add_col', index, count))
 
     def insert_row(self, index):
+        self._finish_paste()
         # Context menu insert - show dialog to ask how many rows
         dialog = InsertQuantityDialog(mode='row', current_count=self.rowCount(), parent=self)
         if dialog.exec() != QDialog.DialogCode.Accepted:
@@ -1319,51 +2002,36 @@ class Spreadsheet(QTableWidget):
         self.undo_stack.push(ResizeCommand(self, 'add_row', index, count))
 
     def clear_column_contents(self, index):
-        changes = []
-        for r in range(self.rowCount()):
-            item = self.item(r, index)
-            if item:
-                old_data = item.get_data()
-                if old_data.get('value'):
-                    new_data = old_data.copy()
-                    new_data['value'] = ''
-                    changes.append((r, index, old_data, new_data))
-        if changes:
-            self.undo_stack.push(ChangeCellCommand(self, changes, "Clear Column Contents"))
+        patches = self._clear_value_patches([(0, index, self.rowCount() - 1, index)])
+        if patches:
+            self.undo_stack.push(CellPatchCommand(self, ('value',), patches, "Clear Column Contents"))
 
     def clear_row_contents(self, index):
-        changes = []
-        for c in range(self.columnCount()):
-            item = self.item(index, c)
-            if item:
-                old_data = item.get_data()
-                if old_data.get('value'):
-                    new_data = old_data.copy()
-                    new_data['value'] = ''
-                    changes.append((index, c, old_data, new_data))
-        if changes:
-            self.undo_stack.push(ChangeCellCommand(self, changes, "Clear Row Contents"))
+        patches = self._clear_value_patches([(index, 0, index, self.columnCount() - 1)])
+        if patches:
+            self.undo_stack.push(CellPatchCommand(self, ('value',), patches, "Clear Row Contents"))
 
     def set_bold(self): self._toggle_font('bold')
     def set_italic(self): self._toggle_font('italic')
     def set_underline(self): self._toggle_font('underline')
     def _toggle_font(self, p):
-        changes = []
-        for i in self.selectedItems():
-            o = i.get_data()
-            n = o.copy()
-            if 'font' not in n:
-                n['font'] = {}
-            n['font'][p] = not n['font'].get(p, False)
-            changes.append((i.row(), i.column(), o, n))
-        if changes: self.undo_stack.push(ChangeCellCommand(self, changes, f"Toggle {p}"))
+        patches = []
+        # Read stored cells directly instead of building a SpreadsheetItem per selected cell
+        cell = self._model.cell
+        for index in self.selectedIndexes():
+            row, col = index.row(), index.column()
+            data = cell(row, col)
+            if data is None: continue
+            font = data.get('font') or {}
+            patches.append((row, col, font.get(p, _UNSET), not font.get(p, False)))
+        if patches: self.undo_stack.push(CellPatchCommand(self, ('font', p), patches, f"Toggle {p}"))
 
     def set_text_color(self): self._set_color('text_color')
     def set_background_color(self): self._set_color('bg_color')
     def _set_color(self, p):
         c = ColorSelector.getColor(QColor("black"), self)
         if not c.isValid(): return
-        changes = []
+        patches = []
         # If "No Fill" was selected, the color will be transparent (#00000000)
         # In this case, we set the property to None to indicate no custom color (use default)
         is_no_fill = c.alpha() == 0 and c.name(QColor.NameFormat.HexArgb).upper() == "#00000000"
@@ -1374,18 +2042,10 @@ class Spreadsheet(QTableWidget):
         for range_obj in selected_ranges:
             for row in range(range_obj.topRow(), range_obj.bottomRow() + 1):
                 for col in range(range_obj.leftColumn(), range_obj.rightColumn() + 1):
-                    # Get or create item using SpreadsheetItem (custom item class)
-                    item = self.item(row, col)
-                    if item is None:
-                        item = SpreadsheetItem()
-                        self.setItem(row, col, item)
-                    
-                    o = item.get_data()
-                    n = o.copy()
-                    n[p] = color_value
-                    changes.append((row, col, o, n))
+                    o = self._model.cell(row, col) or {}
+                    patches.append((row, col, o.get(p, _UNSET), color_value))
         
-        if changes: self.undo_stack.push(ChangeCellCommand(self, changes, "Color"))
+        if patches: self.undo_stack.push(CellPatchCommand(self, (p,), patches, "Color"))
     
     def on_selection_changed(self):
         self.viewport().update()
@@ -1394,31 +2054,34 @@ class Spreadsheet(QTableWidget):
         self.completer_popup.hide()
     
     def on_formula_bar_text_changed(self, text):
+        had_refs = bool(self.referenced_cells)
         self.referenced_cells.clear()
         self.formula_hint.hide()
         self.completer_popup.hide()
-        if text.startswith('='):
-            text_upper = text.upper()
-            # Updated regex to handle absolute cell references with $ signs (e.g., $A$1, $A1, A$1)
-            refs = re.findall(r"\$?([A-Z]+)\$?(\d+)", text_upper)
-            for i, (c_str, r_str) in enumerate(refs):
-                r, c = int(r_str)-1, col_str_to_int(c_str)
-                self.referenced_cells.append(((r, c), self.ref_colors[i % 4]))
-            syntax_match = re.search(r"([A-Z_]+)\(([^)]*)$", text_upper)
-            if syntax_match:
-                func_name = syntax_match.group(1)
-                args_text = syntax_match.group(2)
-                if func_name in FUNCTION_HINTS:
-                    self.show_syntax_hint(func_name, args_text)
-            else:
-                completer_match = re.search(r"=([A-Z_]*)$", text_upper)
-                if completer_match:
-                    self.show_completer_popup(completer_match.group(1))
+        if not text.startswith('='):
+            # Plain text draws nothing; repaint only to erase old reference outlines
+            if had_refs:
+                self.viewport().update()
+            return
+        text_upper = text.upper()
+        refs = _FORMULA_REF_RE.findall(text_upper)
+        for i, (c_str, r_str) in enumerate(refs):
+            r, c = int(r_str)-1, col_str_to_int(c_str)
+            self.referenced_cells.append(((r, c), self._ref_pens[i % 4]))
+        syntax_match = _OPEN_FUNCTION_RE.search(text_upper)
+        if syntax_match:
+            func_name = syntax_match.group(1)
+            args_text = syntax_match.group(2)
+            if func_name in FUNCTION_HINTS:
+                self.show_syntax_hint(func_name, args_text)
+        else:
+            completer_match = _FUNCTION_PREFIX_RE.search(text_upper)
+            if completer_match:
+                self.show_completer_popup(completer_match.group(1))
         self.viewport().update()
 
     def show_syntax_hint(self, func_name, args_text):
-        hint_template = FUNCTION_HINTS[func_name]
-        arg_parts = hint_template[len(func_name)+1:-1].split(',')
+        arg_parts = list(_HINT_ARGS[func_name])
         current_arg_index = args_text.count(',')
         if current_arg_index < len(arg_parts):
             arg_parts[current_arg_index] = f"<b>{arg_parts[current_arg_index].strip()}</b>"
@@ -1433,10 +2096,22 @@ class Spreadsheet(QTableWidget):
             self.formula_hint.raise_()
 
     def show_completer_popup(self, partial_func):
-        matches = [f for f in FUNCTION_HINTS if f.startswith(partial_func)]
+        node = _FUNCTION_TRIE
+        for char in partial_func:
+            node = node.get(char)
+            if node is None: return
+        matches = node[None]
         if matches:
-            self.completer_popup.clear()
-            self.completer_popup.addItems(matches)
+            if self._completer_prefix is not None and partial_func.startswith(self._completer_prefix):
+                # A longer prefix only narrows the list, so hide rows instead of rebuilding it
+                visible = set(matches)
+                for i, name in enumerate(self._completer_names):
+                    self.completer_popup.setRowHidden(i, name not in visible)
+            else:
+                self.completer_popup.clear()
+                self.completer_popup.addItems(matches)
+                self._completer_names = matches
+                self._completer_prefix = partial_func
             current_rect = self.visualRect(self.currentIndex())
             if current_rect.isValid():
                 global_pos = self.viewport().mapToGlobal(current_rect.bottomLeft())
@@ -1465,56 +2140,48 @@ class Spreadsheet(QTableWidget):
     def paintEvent(self, event):
         super().paintEvent(event)
         painter = QPainter(self.viewport())
+        model = self._model
+        visual_rect = self.visualRect
         
         # Draw hover effect
         if self.hover_row != -1 and self.hover_col != -1:
-            rect = self.visualRect(self.model().index(self.hover_row, self.hover_col))
+            rect = visual_rect(model.index(self.hover_row, self.hover_col))
             if rect.isValid():
-                # Use semi-transparent hover color so text remains visible
-                hover_color = QColor(colors.COLOR_HOVER)
-                hover_color.setAlpha(60) 
-                painter.fillRect(rect, hover_color)
+                painter.fillRect(rect, self._hover_color)
 
-        for (row, col), color in self.referenced_cells:
-            rect = self.visualRect(self.model().index(row, col))
-            if rect.isValid():
-                painter.setPen(QPen(color, 1, Qt.PenStyle.DashLine))
-                painter.setBrush(Qt.BrushStyle.NoBrush)
-                painter.drawRect(rect.adjusted(0, 0, -1, -1))
-        for (row, col) in self.highlighted_cells:
-            rect = self.visualRect(self.model().index(row, col))
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        for (row, col), pen in self.referenced_cells:
+            rect = visual_rect(model.index(row, col))
             if rect.isValid():
-                # Make highlighted cells (blue line) transparent as requested
-                painter.setPen(QPen(Qt.GlobalColor.transparent, 2))
-                painter.setBrush(Qt.BrushStyle.NoBrush)
+                painter.setPen(pen)
                 painter.drawRect(rect.adjusted(0, 0, -1, -1))
-        if not self.selectionModel().hasSelection(): return
-        selection = self.selectionModel().selection()
-        current_index = self.currentIndex()
+        # Highlighted cells (precedent tracing) are kept transparent as requested,
+        # so there is nothing to draw for them.
+        selection_model = self.selectionModel()
+        if not selection_model.hasSelection(): return
         # Don't fill background here - delegate now handles selection background
         # Only draw the selection border
-        selection_rect = self.visualRegionForSelection(selection).boundingRect()
+        selection_rect = self.visualRegionForSelection(selection_model.selection()).boundingRect()
         # Draw a solid green border around the selection
-        painter.setPen(QPen(QColor(colors.COLOR_SELECTION_FILL), 2))
-        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.setPen(self._selection_pen)
         painter.drawRect(selection_rect.adjusted(0, 0, -1, -1))
         handle_rect = self.get_fill_handle_rect()
         if handle_rect:
-            painter.setBrush(QBrush(QColor(colors.COLOR_SELECTION_FILL)))
+            painter.setBrush(self._fill_handle_brush)
             painter.setPen(Qt.PenStyle.NoPen)
             painter.drawRect(handle_rect)
         if self._is_dragging_fill_handle and self._drag_fill_rect:
-            painter.setPen(QPen(QColor(colors.BORDER_DARK), 1, Qt.PenStyle.DashLine))
+            painter.setPen(self._drag_fill_pen)
             painter.setBrush(Qt.BrushStyle.NoBrush)
             painter.drawRect(self._drag_fill_rect)
 
-    def get_fill_handle_rect(self):
-        selected_ranges = self.selectedRanges()
+    def get_fill_handle_rect(self, selected_ranges=None):
+        if selected_ranges is None:
+            selected_ranges = self.selectedRanges()
         if not selected_ranges: return None
         last_range = selected_ranges[-1]
         # Use visualRect with model index instead of item to support empty cells
-        index = self.model().index(last_range.bottomRow(), last_range.rightColumn())
-        last_cell_rect = self.visualRect(index)
+        last_cell_rect = self.visualRect(self._model.index(last_range.bottomRow(), last_range.rightColumn()))
         if last_cell_rect.isValid():
             return QRectF(last_cell_rect.right() - 4, last_cell_rect.bottom() - 4, 8, 8)
         return None
@@ -1534,9 +2201,12 @@ class Spreadsheet(QTableWidget):
                 else:
                     editor.insert(cell_ref)
             return
-        handle_rect = self.get_fill_handle_rect()
+        selected_ranges = self.selectedRanges()
+        handle_rect = self.get_fill_handle_rect(selected_ranges)
         if handle_rect and handle_rect.contains(event.position()):
             self._is_dragging_fill_handle = True
+            # The selection can't change mid-drag, so read it once for all moves
+            self._fill_source_range = selected_ranges[0]
             self._drag_start_pos = event.position()
             self.setCursor(Qt.CursorShape.CrossCursor)
         else:
@@ -1556,36 +2226,48 @@ class Spreadsheet(QTableWidget):
         col = self.columnAt(int(pos.x()))
         
         if row != self.hover_row or col != self.hover_col:
+            # Only the cells entering and leaving the hover state need repainting
+            self._update_cell(self.hover_row, self.hover_col)
             self.hover_row = row
             self.hover_col = col
-            self.viewport().update()
+            self._update_cell(row, col)
 
         if self._is_dragging_fill_handle:
-            selection_ranges = self.selectedRanges()
-            if not selection_ranges: return
-            selection_range = selection_ranges[0]
+            selection_range = self._fill_source_range
             # Use visualRect instead of visualItemRect to support empty cells
-            index = self.model().index(selection_range.topRow(), selection_range.leftColumn())
-            start_rect = self.visualRect(index)
+            start_rect = self.visualRect(self._model.index(selection_range.topRow(), selection_range.leftColumn()))
             if not start_rect.isValid(): return
             
-            clamped_pos = event.position()
-            if clamped_pos.y() > self.viewport().height():
-                 clamped_pos.setY(float(self.viewport().height()))
-            if clamped_pos.x() > self.viewport().width():
-                 clamped_pos.setX(float(self.viewport().width()))
+            viewport = self.viewport()
+            viewport_height, viewport_width = viewport.height(), viewport.width()
+            clamped_pos = pos
+            if clamped_pos.y() > viewport_height:
+                 clamped_pos.setY(float(viewport_height))
+            if clamped_pos.x() > viewport_width:
+                 clamped_pos.setX(float(viewport_width))
                  
-            self._drag_fill_rect = QRectF(QPointF(start_rect.topLeft()), clamped_pos).normalized()
-            self.viewport().update()
+            drag_rect = QRectF(QPointF(start_rect.topLeft()), clamped_pos).normalized()
+            if drag_rect == self._drag_fill_rect:
+                return
+            previous_rect = self._drag_fill_rect
+            self._drag_fill_rect = drag_rect
+            # Repaint only the area the dashed outline moved across (plus its pen)
+            dirty_rect = drag_rect if previous_rect is None else drag_rect.united(previous_rect)
+            viewport.update(dirty_rect.toAlignedRect().adjusted(-2, -2, 2, 2))
         else:
             super().mouseMoveEvent(event)
 
     def leaveEvent(self, event):
+        self._update_cell(self.hover_row, self.hover_col)
         self.hover_row = -1
         self.hover_col = -1
-        self.viewport().update()
         super().leaveEvent(event)
 
+    def _update_cell(self, row, col):
+        """Schedules a repaint of one cell's rectangle instead of the whole viewport."""
+        if row != -1 and col != -1:
+            self.viewport().update(self.visualRect(self._model.index(row, col)))
+
     def mouseReleaseEvent(self, event):
         if self._is_dragging_fill_handle:
             self.setCursor(Qt.CursorShape.ArrowCursor)
@@ -1596,76 +2278,77 @@ class Spreadsheet(QTableWidget):
                 if end_row == -1: end_row = self.rowCount() - 1
                 if end_col == -1: end_col = self.columnCount() - 1
                 
-                self.perform_fill_drag(end_row, end_col)
+                self.perform_fill_drag(end_row, end_col, self._fill_source_range)
             self._is_dragging_fill_handle = False
+            self._fill_source_range = None
             self._drag_start_pos = None
             self._drag_fill_rect = None
             self.viewport().update()
         else:
             super().mouseReleaseEvent(event)
 
-    def perform_fill_drag(self, end_row, end_col):
-        selected_ranges = self.selectedRanges()
-        if not selected_ranges: return
-        source_range = selected_ranges[0]
+    def perform_fill_drag(self, end_row, end_col, source_range=None):
+        if source_range is None:
+            selected_ranges = self.selectedRanges()
+            if not selected_ranges: return
+            source_range = selected_ranges[0]
+        top, bottom = source_range.topRow(), source_range.bottomRow()
+        left, right = source_range.leftColumn(), source_range.rightColumn()
         
         # Determine direction
-        rows_ext = end_row - source_range.bottomRow()
-        cols_ext = end_col - source_range.rightColumn()
+        rows_ext = end_row - bottom
+        cols_ext = end_col - right
         
         changes = []
+        model = self._model
+        match_number = _NUMBER_SUFFIX_RE.match
+
+        def fill_source(row, col):
+            # Classify each source cell once; every target it repeats into
+            # then only needs the offset arithmetic. Formulas come back with
+            # an empty prefix and no number, plain text with no prefix at all.
+            data = model.cell(row, col) or {'value': ''}
+            text = str(data.get('value', ''))
+            if text.startswith('='):
+                return data, text, '', None
+            match = match_number(text)
+            if match:
+                prefix, num_str = match.groups()
+                return data, text, prefix, int(num_str)
+            return data, text, None, None
+
+        def fill_value(source, i, row_offset, col_offset):
+            # New dict for the i-th target cell filled from `source`
+            source_data, source_text, prefix, number = source
+            new_data = source_data.copy()
+            if prefix is None:
+                new_data['value'] = source_text
+            elif number is None:
+                new_data['value'] = adjust_formula_references(source_text, row_offset, col_offset)
+            else:
+                new_data['value'] = f"{prefix}{number + i}"
+            return new_data
         
+        # Sources repeat through the targets via cycle(), so no per-cell modulo
         if rows_ext > 0 and (rows_ext >= cols_ext or cols_ext <= 0):
             # Fill Down
-            fill_rows = range(source_range.bottomRow() + 1, end_row + 1)
-            for col in range(source_range.leftColumn(), source_range.rightColumn() + 1):
-                for i, target_row in enumerate(fill_rows, 1):
-                    source_row = source_range.topRow() + (i - 1) % source_range.rowCount()
-                    source_item = self.item(source_row, col)
-                    source_data = source_item.get_data() if source_item else {'value': ''}
-                    source_text = str(source_data.get('value', ''))
-                    new_data = source_data.copy()
-                    
-                    if source_text.startswith('='):
-                        new_data['value'] = adjust_formula_references(source_text, target_row - source_row, 0)
-                    else:
-                        match = re.match(r"^(.*?)(\d+)$", source_text)
-                        if match:
-                            prefix, num_str = match.groups()
-                            new_value = int(num_str) + i
-                            new_data['value'] = f"{prefix}{new_value}"
-                        else:
-                            new_data['value'] = source_text
-                            
-                    target_item = self.item(target_row, col)
-                    old_data = target_item.get_data() if target_item else {'value': ''}
-                    changes.append((target_row, col, old_data, new_data))
+            fill_rows = range(bottom + 1, end_row + 1)
+            for col in range(left, right + 1):
+                sources = [fill_source(row, col) for row in range(top, bottom + 1)]
+                targets = zip(fill_rows, cycle(enumerate(sources, top)))
+                for i, (target_row, (source_row, source)) in enumerate(targets, 1):
+                    old_data = model.cell(target_row, col) or {'value': ''}
+                    changes.append((target_row, col, old_data, fill_value(source, i, target_row - source_row, 0)))
                     
         elif cols_ext > 0 and (cols_ext > rows_ext or rows_ext <= 0):
             # Fill Right
-            fill_cols = range(source_range.rightColumn() + 1, end_col + 1)
-            for row in range(source_range.topRow(), source_range.bottomRow() + 1):
-                for i, target_col in enumerate(fill_cols, 1):
-                    source_col = source_range.leftColumn() + (i - 1) % source_range.columnCount()
-                    source_item = self.item(row, source_col)
-                    source_data = source_item.get_data() if source_item else {'value': ''}
-                    source_text = str(source_data.get('value', ''))
-                    new_data = source_data.copy()
-                    
-                    if source_text.startswith('='):
-                        new_data['value'] = adjust_formula_references(source_text, 0, target_col - source_col)
-                    else:
-                        match = re.match(r"^(.*?)(\d+)$", source_text)
-                        if match:
-                            prefix, num_str = match.groups()
-                            new_value = int(num_str) + i
-                            new_data['value'] = f"{prefix}{new_value}"
-                        else:
-                            new_data['value'] = source_text
-                            
-                    target_item = self.item(row, target_col)
-                    old_data = target_item.get_data() if target_item else {'value': ''}
-                    changes.append((row, target_col, old_data, new_data))
+            fill_cols = range(right + 1, end_col + 1)
+            for row in range(top, bottom + 1):
+                sources = [fill_source(row, col) for col in range(left, right + 1)]
+                targets = zip(fill_cols, cycle(enumerate(sources, left)))
+                for i, (target_col, (source_col, source)) in enumerate(targets, 1):
+                    old_data = model.cell(row, target_col) or {'value': ''}
+                    changes.append((row, target_col, old_data, fill_value(source, i, 0, target_col - source_col)))
 
         if changes:
             command = ChangeCellCommand(self, changes, "Fill Drag")
@@ -1674,9 +2357,9 @@ class Spreadsheet(QTableWidget):
     def trace_precedents(self):
         current_item = self.currentItem()
         if not current_item: return
-        cell = (current_item.row(), current_item.column())
-        if cell in self.precedents:
-            self.highlighted_cells.update(self.precedents[cell])
+        key = _cell_key(current_item.row(), current_item.column())
+        if key in self.precedents:
+            self.highlighted_cells.update(_cell_pos(prec) for prec in self.precedents[key])
             self.viewport().update()
 
     def clear_highlights(self):
@@ -3,6 +3,7 @@ import re
 import statistics
 import operator
 import math
+from functools import lru_cache
 
 FUNCTION_HINTS = {
     # ... (keep existing dict)
@@ -55,12 +56,41 @@ FUNCTION_HINTS = {
     "IFNA": "IFNA(value, value_if_na)",
 }
 
+# Cell references such as A1, $A1, A$1 and $A$1 (either case), and quoted string literals
+_CELL_REF_RE = re.compile(r"(\$?[A-Za-z]+)(\$?\d+)")
+_QUOTED_RE = re.compile(r'("[^"]*")')
+_CELL_COORDS_RE = re.compile(r"([A-Z]+)(\d+)")
+
+# Formula tokenizer, compiled once for every parser instance
+_TOKEN_SPECIFICATION = [
+    ('FUNCTION',  r'[A-Z][A-Z0-9_]*\('),
+    ('CELLRANGE', r'\$?[A-Z]+\$?[0-9]+:\$?[A-Z]+\$?[0-9]+'),
+    ('CELL',      r'\$?[A-Z]+\$?[0-9]+'),
+    ('NUMBER',    r'[0-9]+(\.[0-9]*)?'),
+    ('BOOLEAN',   r'TRUE|FALSE'),
+    ('STRING',    r'"[^"]*"'),
+    ('OP_CMP',    r'<=|>=|<>|!=|==|<|>|='),
+    ('OP_ADD',    r'[\+\-]'),
+    ('OP_MUL',    r'[\*/]'),
+    ('OP_POW',    r'\^'),
+    ('LPAREN',    r'\('),
+    ('RPAREN',    r'\)'),
+    ('COMMA',     r','),
+    ('WHITESPACE',r'\s+'),
+    ('IDENTIFIER',r'[A-Z][A-Z0-9_]*'), # Catch-all for text like 'SUM' without parens or 's'
+    ('MISMATCH',  r'.'),
+]
+_TOKEN_RE = re.compile('|'.join('(?P<%s>%s)' % pair for pair in _TOKEN_SPECIFICATION), re.IGNORECASE)
+
+# Sheets have a few dozen columns at most, so both conversions memoize cheaply
+@lru_cache(maxsize=256)
 def col_str_to_int(col_str):
     num = 0
     for char in col_str:
         num = num * 26 + (ord(char.upper()) - ord('A')) + 1
     return num - 1
 
+@lru_cache(maxsize=256)
 def col_int_to_str(col_idx):
     col_str = ""
     temp = col_idx
@@ -69,13 +99,18 @@ def col_int_to_str(col_idx):
         temp = temp // 26 - 1
     return col_str
 
-def adjust_formula_references(formula, row_offset, col_offset, min_row=0, min_col=0, delete_row=-1, delete_col=-1):
+@lru_cache(maxsize=4096)
+def _cell_ref_coords(ref):
+    """Returns the (row, col) of an A1-style reference, ignoring '$' markers."""
+    match = _CELL_COORDS_RE.match(ref.replace('$', '').upper())
+    if not match: raise ValueError("Invalid cell ref")
+    col_str, row_str = match.groups()
+    return int(row_str) - 1, col_str_to_int(col_str)
+
+def adjust_formula_references(formula, row_offset, col_offset, min_row=0, min_col=0, delete_row=-1, delete_col=-1, delete_count=1):
     if not formula.startswith('='):
         return formula
 
-    # Use re.IGNORECASE flag to match both uppercase and lowercase cell references
-    ref_regex = re.compile(r"(\$?[A-Za-z]+)(\$?\d+)")
-
     def replacement(match):
         col_part = match.group(1)
         row_part = match.group(2)
@@ -92,9 +127,9 @@ def adjust_formula_references(formula, row_offset, col_offset, min_row=0, min_co
         col_idx = col_str_to_int(col_letter)
         row_idx = int(row_number) - 1
 
-        # Check for deleted row/column references
-        if (delete_row != -1 and row_idx == delete_row) or \
-           (delete_col != -1 and col_idx == delete_col):
+        # Check for deleted row/column references (a run of delete_count from delete_row/col)
+        if (delete_row != -1 and 0 <= row_idx - delete_row < delete_count) or \
+           (delete_col != -1 and 0 <= col_idx - delete_col < delete_count):
             return "#REF!"
 
         # Only shift row if it's not absolute and >= threshold
@@ -112,12 +147,20 @@ def adjust_formula_references(formula, row_offset, col_offset, min_row=0, min_co
         row_str = ('$' if is_row_absolute else '') + str(row_idx + 1)
         return f"{col_str}{row_str}"
 
-    parts = re.split(r'("[^"]*")', formula)
+    # Formulas without string literals (the common case) skip the split/join, and
+    # formulas without any reference come back as the very same object.
+    if '"' not in formula:
+        adjusted, count = _CELL_REF_RE.subn(replacement, formula)
+        return adjusted if count else formula
+
+    parts = _QUOTED_RE.split(formula)
+    total = 0
     for i, part in enumerate(parts):
         if not part.startswith('"'):
-            parts[i] = ref_regex.sub(replacement, part)
-    
-    return "".join(parts)
+            parts[i], count = _CELL_REF_RE.subn(replacement, part)
+            total += count
+
+    return "".join(parts) if total else formula
 
 
 class FormulaParser:
@@ -209,35 +252,39 @@ class FormulaParser:
     def evaluate(self, expression):
         if not expression: return ""
         try:
-            self.tokens = self._tokenize(expression)
-            self.pos = 0
-            result = self._parse_expression()
-            return result
+            return self.evaluate_parsed(self.parse(expression))
         except Exception as e:
             return f"#ERROR: {str(e)}"
 
+    def parse(self, expression):
+        """Tokenizes an expression once so evaluate_parsed() can run it repeatedly."""
+        return tuple(self._tokenize(expression))
+
+    def evaluate_parsed(self, tokens):
+        """Evaluates tokens returned by parse(). Errors propagate to the caller."""
+        if not tokens: return ""
+        self.tokens = tokens
+        self.pos = 0
+        return self._parse_expression()
+
+    def references(self, expression):
+        """Returns every (row, col) the expression refers to, without evaluating it."""
+        refs = set()
+        for kind, value in self._tokenize(expression):
+            if kind == 'CELL':
+                refs.add(self._cell_coords(value.replace('$', '')))
+            elif kind == 'CELLRANGE':
+                start_ref, end_ref = value.replace('$', '').split(':')
+                r1, c1 = self._cell_coords(start_ref)
+                r2, c2 = self._cell_coords(end_ref)
+                for r in range(min(r1, r2), max(r1, r2) + 1):
+                    for c in range(min(c1, c2), max(c1, c2) + 1):
+                        refs.add((r, c))
+        return refs
+
     def _tokenize(self, expression):
-        token_specification = [
-            ('FUNCTION',  r'[A-Z][A-Z0-9_]*\('),
-            ('CELLRANGE', r'\$?[A-Z]+\$?[0-9]+:\$?[A-Z]+\$?[0-9]+'),
-            ('CELL',      r'\$?[A-Z]+\$?[0-9]+'),
-            ('NUMBER',    r'[0-9]+(\.[0-9]*)?'),
-            ('BOOLEAN',   r'TRUE|FALSE'),
-            ('STRING',    r'"[^"]*"'),
-            ('OP_CMP',    r'<=|>=|<>|!=|==|<|>|='), 
-            ('OP_ADD',    r'[\+\-]'),
-            ('OP_MUL',    r'[\*/]'),
-            ('OP_POW',    r'\^'),
-            ('LPAREN',    r'\('),
-            ('RPAREN',    r'\)'),
-            ('COMMA',     r','),
-            ('WHITESPACE',r'\s+'),
-            ('IDENTIFIER',r'[A-Z][A-Z0-9_]*'), # Catch-all for text like 'SUM' without parens or 's'
-            ('MISMATCH',  r'.'),
-        ]
-        tok_regex = '|'.join('(?P<%s>%s)' % pair for pair in token_specification)
         tokens = []
-        for mo in re.finditer(tok_regex, expression, re.IGNORECASE):
+        for mo in _TOKEN_RE.finditer(expression):
             kind = mo.lastgroup
             value = mo.group()
             if kind == 'WHITESPACE':
@@ -468,13 +515,8 @@ class FormulaParser:
             self.pos += 1
 
     def _resolve_cell(self, ref):
-        # Strip $ signs for absolute references - they don't affect evaluation, only copy/fill behavior
-        clean_ref = ref.replace('$', '').upper()
-        match = re.match(r"([A-Z]+)(\d+)", clean_ref)
-        if not match: raise ValueError("Invalid cell ref")
-        col_str, row_str = match.groups()
-        row = int(row_str) - 1
-        col = col_str_to_int(col_str)
+        # $ signs for absolute references don't affect evaluation, only copy/fill behavior
+        row, col = _cell_ref_coords(ref)
         if hasattr(self.table, 'add_dependency'):
             self.table.add_dependency(self.current_cell, (row, col))
         return self.table.get_cell_value(row, col)
@@ -496,9 +538,7 @@ class FormulaParser:
         return vals
 
     def _cell_coords(self, ref):
-        match = re.match(r"([A-Z]+)(\d+)", ref.upper())
-        col_str, row_str = match.groups()
-        return int(row_str) - 1, col_str_to_int(col_str)
+        return _cell_ref_coords(ref)
 
     def _vlookup(self, lookup_val, table_array, col_idx_num, range_lookup=True):
         col_idx = int(col_idx_num) - 1
@@ -546,4 +586,123 @@ class FormulaParser:
             parts = text.split(old)
             if len(parts) <= count: return text
             return old.join(parts[:count]) + new + old.join(parts[count:])
-        return text.replace(old, new)
\ No newline at end of file
+        return text.replace(old, new)
+
+def _checked_div(left, right):
+    if right == 0: raise ValueError("Div by Zero")
+    return operator.itruediv(left, right)
+
+
+class FormulaCompiler:
+    """
+    Tiered compiler for pure-arithmetic formulas.
+
+    Token streams made only of numbers, cell references, + - * / ^ and
+    parentheses are translated into a Python lambda once their shape has been
+    evaluated COMPILE_THRESHOLD times. A shape ignores which cells are
+    referenced, so a formula filled down a column compiles once. Everything
+    else, and anything the compiler can't mirror exactly, is left to
+    FormulaParser.
+    """
+    COMPILE_THRESHOLD = 3
+    _COMPILABLE = frozenset(('NUMBER', 'CELL', 'OP_ADD', 'OP_MUL', 'OP_POW', 'LPAREN', 'RPAREN'))
+    _NAMESPACE = {'_iadd': operator.iadd, '_isub': operator.isub, '_imul': operator.imul, '_div': _checked_div}
+
+    def __init__(self):
+        self._compiled = {}  # shape -> lambda, or None when the shape can't be compiled
+        self._hits = {}
+
+    def evaluate(self, parser, tokens):
+        """Evaluates parsed tokens, via compiled code when the shape is hot enough."""
+        if not tokens or any(kind not in self._COMPILABLE for kind, _ in tokens):
+            return parser.evaluate_parsed(tokens)
+
+        shape = tuple(kind if kind == 'CELL' else (kind, value) for kind, value in tokens)
+        if shape not in self._compiled:
+            hits = self._hits.get(shape, 0) + 1
+            if hits < self.COMPILE_THRESHOLD:
+                self._hits[shape] = hits
+                return parser.evaluate_parsed(tokens)
+            del self._hits[shape]
+            self._compiled[shape] = self._compile(shape)
+
+        func = self._compiled[shape]
+        if func is None:
+            return parser.evaluate_parsed(tokens)
+        # Resolve through the parser so dependencies are recorded exactly as when interpreting
+        return func(*[parser._resolve_cell(value) for kind, value in tokens if kind == 'CELL'])
+
+    def _compile(self, shape):
+        self._shape = shape
+        self._pos = 0
+        self._args = 0
+        try:
+            source = self._emit_additive()
+        except (IndexError, ValueError):
+            return None
+        if self._pos != len(shape):
+            return None  # The interpreter ignores trailing tokens; let it keep doing so
+        params = ", ".join(f"v{i}" for i in range(self._args))
+        code = compile(f"lambda {params}: {source}", "<formula>", "eval")
+        return eval(code, self._NAMESPACE)
+
+    # The emitters mirror FormulaParser's grammar, fully parenthesized so
+    # Python precedence never differs from the interpreter's. In-place operator
+    # functions keep error messages identical to the interpreter's `left += right`.
+
+    def _next(self):
+        token = self._shape[self._pos]
+        self._pos += 1
+        return token
+
+    def _peek_op(self, kind):
+        if self._pos < len(self._shape):
+            token = self._shape[self._pos]
+            if token != 'CELL' and token[0] == kind:
+                return token[1]
+        return None
+
+    def _emit_additive(self):
+        left = self._emit_multiplicative()
+        op = self._peek_op('OP_ADD')
+        while op is not None:
+            self._pos += 1
+            func = '_iadd' if op == '+' else '_isub'
+            left = f"{func}({left}, {self._emit_multiplicative()})"
+            op = self._peek_op('OP_ADD')
+        return left
+
+    def _emit_multiplicative(self):
+        left = self._emit_power()
+        op = self._peek_op('OP_MUL')
+        while op is not None:
+            self._pos += 1
+            right = self._emit_power()
+            left = f"_imul({left}, {right})" if op == '*' else f"_div({left}, {right})"
+            op = self._peek_op('OP_MUL')
+        return left
+
+    def _emit_power(self):
+        left = self._emit_atom()
+        if self._peek_op('OP_POW') is not None:
+            self._pos += 1
+            left = f"({left} ** {self._emit_power()})"
+        return left
+
+    def _emit_atom(self):
+        token = self._next()
+        if token == 'CELL':
+            name = f"v{self._args}"
+            self._args += 1
+            return name
+        kind, value = token
+        if kind == 'NUMBER':
+            return repr(value)
+        if kind == 'LPAREN':
+            inner = self._emit_additive()
+            if self._next() != ('RPAREN', ')'):
+                raise ValueError("Expected RPAREN")
+            return inner
+        if kind == 'OP_ADD' and value == '-':
+            return f"(-{self._emit_atom()})"
+        raise ValueError(f"Unexpected token {value}")
@@ -6,8 +6,11 @@ Only visible cells are rendered, background operations are async.
 """
 
 import collections
+import itertools
 import re
 import threading
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Dict, List, Tuple, Set, Any
 from dataclasses import dataclass
 from PySide6.QtWidgets import (
@@ -15,17 +18,106 @@ from PySide6.QtWidgets import (
     QMessageBox, QApplication, QLabel, QLineEdit, QWidget, QVBoxLayout
 )
 from PySide6.QtCore import (
-    Qt, QRect, QSize, QPoint, Signal, QTimer, QMutex, 
+    Qt, QRect, QLine, QSize, QPoint, Signal, QTimer, 
     QThread, Slot, QEvent
 )
 from PySide6.QtGui import (
-    QPainter, QPen, QColor, QBrush, QFont, QIcon, QCursor, QUndoStack, QUndoCommand
+    QPainter, QPen, QColor, QBrush, QFont, QIcon, QCursor, QRegion, QUndoStack, QUndoCommand
 )
 from styles import colors
-from .comment_utils import FormulaParser, FUNCTION_HINTS, adjust_formula_references, col_str_to_int, col_int_to_str
+from .comment_utils import FormulaParser, FormulaCompiler, FUNCTION_HINTS, adjust_formula_references, col_str_to_int, col_int_to_str
 
 
-@dataclass
+class _StoreFormulaParser(FormulaParser):
+    """FormulaParser that reads range references from the sparse store in one pass."""
+
+    def _resolve_range(self, ref_range):
+        start_ref, end_ref = ref_range.replace('$', '').split(':')
+        r1, c1 = self._cell_coords(start_ref)
+        r2, c2 = self._cell_coords(end_ref)
+        top, bottom = min(r1, r2), max(r1, r2)
+        left, right = min(c1, c2), max(c1, c2)
+        table = self.table
+        if hasattr(table, 'add_dependency'):
+            for r in range(top, bottom + 1):
+                for c in range(left, right + 1):
+                    table.add_dependency(self.current_cell, (r, c))
+        # Empty cells read as 0, as get_cell_value reports them, so only stored
+        # cells inside the range need a lookup
+        vals = [[0] * (right - left + 1) for _ in range(top, bottom + 1)]
+        for r, c in table.data_store.get_visible_range(top, bottom, left, right):
+            vals[r - top][c - left] = table.get_cell_value(r, c)
+        return vals
+
+
+# Tokenizing needs no table, so one parser serves every formula string
+_TOKENIZER = FormulaParser(None, None)
+
+
+@lru_cache(maxsize=4096)
+def _parse_formula(expression):
+    """
+    Tokens for a formula body, parsed once per distinct string. Keyed by the text
+    itself, so an edited cell simply looks up its new formula.
+    """
+    return _TOKENIZER.parse(expression)
+
+
+@lru_cache(maxsize=4096)
+def _formula_refs(expression):
+    """Every (row, col) a formula body refers to; empty if it can't be tokenized."""
+    try:
+        return frozenset(_TOKENIZER.references(expression))
+    except ValueError:
+        return frozenset()
+
+
+def _shift_keys(data, axis, index, delta):
+    """
+    Returns a copy of a (row, col)-keyed dict with keys at or past `index` along
+    `axis` (0 = rows, 1 = columns) moved by `delta`. A negative delta drops the
+    keys in the removed span. Each case is one comprehension, so the rebuild
+    runs without a Python-level loop body or an items() list copy.
+    """
+    if delta < 0:
+        end = index - delta
+        if axis == 0:
+            return {(r + delta if r >= end else r, c): v for (r, c), v in data.items() if not index <= r < end}
+        return {(r, c + delta if c >= end else c): v for (r, c), v in data.items() if not index <= c < end}
+    if axis == 0:
+        return {(r + delta if r >= index else r, c): v for (r, c), v in data.items()}
+    return {(r, c + delta if c >= index else c): v for (r, c), v in data.items()}
+
+
+def _font_key(font):
+    """(bold, italic, underline) key of a cell font dict; an empty dict means plain."""
+    if not font:
+        return (False, False, False)
+    return (bool(font.get('bold', False)), bool(font.get('italic', False)), bool(font.get('underline', False)))
+
+
+def _formula_positions(data):
+    """Set of the keys in a (row, col) -> CellData dict whose value is a formula."""
+    return {key for key, cell in data.items() if cell.value.startswith('=')}
+
+
+_COLOR_CACHE: Dict[str, QColor] = {}
+
+
+def _qcolor(name: str) -> QColor:
+    """QColor for a stored color string, parsed once per distinct string."""
+    color = _COLOR_CACHE.get(name)
+    if color is None:
+        color = _COLOR_CACHE[name] = QColor(name)
+    return color
+
+
+def _empty_cell_dict():
+    """Saved form of an empty cell, identical to CellData().to_dict()."""
+    return {'value': '', 'font': {'bold': False, 'italic': False, 'underline': False}, 'text_color': None, 'bg_color': None}
+
+
+@dataclass(slots=True)
 class CellData:
     """Represents a single cell with its properties."""
     value: str = ''
@@ -57,6 +149,11 @@ class CellData:
         return CellData()
 
 
+# Shared read-only stand-in for every missing or out-of-range cell, so lookups
+# allocate nothing. Changes always go through LazyDataStore.set_cell with a new CellData.
+_EMPTY_CELL = CellData(font=MappingProxyType({'bold': False, 'italic': False, 'underline': False}))
+
+
 @dataclass
 class VirtualSelectionRange:
     """QTableWidgetSelectionRange-like helper for compatibility."""
@@ -146,43 +243,57 @@ class SaveDataThread(QThread):
 
 
 class LazyDataStore:
-    """Efficient data storage with lazy loading and memory management."""
+    """
+    Efficient data storage with lazy loading and memory management.
+
+    Readers (paint, background evaluation and saving) take no lock. Writers
+    serialize on _write_lock; structural edits build the re-keyed dict first
+    and publish it with a single reference assignment, so a reader sees either
+    the old layout or the new one, never a half-built dict. The lock stays on
+    set_cell because structural edits on large sheets run on a DataOperationThread
+    while the UI thread keeps writing cells; it is held only for the dict updates.
+    """
     
     def __init__(self, initial_rows=100, initial_cols=10):
         self._data: Dict[Tuple[int, int], CellData] = {}
         self.row_count = initial_rows
         self.col_count = initial_cols
-        self._lock = QMutex()
-        self._dirty_cells: Set[Tuple[int, int]] = set()
+        self._write_lock = threading.Lock()
+        self.formula_cells: Set[Tuple[int, int]] = set()  # Positions whose value starts with '='
         self._cached_rows: Dict[int, List[CellData]] = {}
     
     def get_cell(self, row: int, col: int) -> CellData:
-        """Get cell data without materializing empty cells."""
+        """Get cell data without materializing empty cells; missing ones return the shared _EMPTY_CELL."""
         if not (0 <= row < self.row_count and 0 <= col < self.col_count):
-            return CellData()
-        return self._data.get((row, col), CellData())
+            return _EMPTY_CELL
+        return self._data.get((row, col), _EMPTY_CELL)
     
     def set_cell(self, row: int, col: int, data: CellData):
-        """Set cell data and mark as dirty."""
+        """Set cell data; an empty cell is dropped from the sparse store."""
         if 0 <= row < self.row_count and 0 <= col < self.col_count:
-            self._lock.lock()
-            try:
-                if (
-                    not data.value
-                    and not data.text_color
-                    and not data.bg_color
-                    and not any(data.font.values())
-                ):
-                    self._data.pop((row, col), None)
+            key = (row, col)
+            empty = (
+                not data.value
+                and not data.text_color
+                and not data.bg_color
+                and not any(data.font.values())
+            )
+            is_formula = data.value.startswith('=')
+            with self._write_lock:
+                if empty:
+                    self._data.pop(key, None)
                 else:
-                    self._data[(row, col)] = data
-                self._dirty_cells.add((row, col))
+                    self._data[key] = data
+                if is_formula:
+                    self.formula_cells.add(key)
+                else:
+                    self.formula_cells.discard(key)
                 # Invalidate cached row
-                if row in self._cached_rows:
-                    del self._cached_rows[row]
-            finally:
-                self._lock.unlock()
+                self._cached_rows.pop(row, None)
     
+    def has_cell(self, row: int, col: int) -> bool:
+        return (row, col) in self._data
+
     def get_row(self, row: int) -> List[CellData]:
         """Get entire row (cached)."""
         if row not in self._cached_rows:
@@ -191,116 +302,97 @@ class LazyDataStore:
     
     def get_visible_range(self, start_row: int, end_row: int, start_col: int, end_col: int) -> Dict:
         """Get only visible cells efficiently."""
+        data = self._data
+        rows = range(max(0, start_row), min(self.row_count, end_row + 1))
+        cols = range(max(0, start_col), min(self.col_count, end_col + 1))
+        if len(rows) * len(cols) > len(data):
+            # Sparse sheet: walking the stored cells is cheaper than probing every
+            # position. items() is listed first since a writer may add cells meanwhile.
+            return {
+                key: cell for key, cell in list(data.items())
+                if key[0] in rows and key[1] in cols
+            }
         visible = {}
-        for row in range(max(0, start_row), min(self.row_count, end_row + 1)):
-            for col in range(max(0, start_col), min(self.col_count, end_col + 1)):
-                key = (row, col)
-                if key in self._data:
-                    visible[key] = self._data[key]
+        for row in rows:
+            for col in cols:
+                cell = data.get((row, col))
+                if cell is not None:
+                    visible[(row, col)] = cell
         return visible
     
     def insert_row(self, index: int, count: int = 1):
         """Insert rows efficiently by shifting data."""
-        self._lock.lock()
-        try:
-            # Create new keys for rows from end to insertion point
-            new_data = {}
-            for (row, col), cell in list(self._data.items()):
-                if row >= index:
-                    new_data[(row + count, col)] = cell
-                else:
-                    new_data[(row, col)] = cell
-            self._data = new_data
-            self.row_count += count
+        with self._write_lock:
+            new_data = _shift_keys(self._data, 0, index, count)
+            self.formula_cells = _formula_positions(new_data)
             self._cached_rows.clear()
-        finally:
-            self._lock.unlock()
+            self.row_count += count
+            self._data = new_data
     
     def insert_column(self, index: int, count: int = 1):
         """Insert columns efficiently by shifting data."""
-        self._lock.lock()
-        try:
-            new_data = {}
-            for (row, col), cell in list(self._data.items()):
-                if col >= index:
-                    new_data[(row, col + count)] = cell
-                else:
-                    new_data[(row, col)] = cell
-            self._data = new_data
-            self.col_count += count
+        with self._write_lock:
+            new_data = _shift_keys(self._data, 1, index, count)
+            self.formula_cells = _formula_positions(new_data)
             self._cached_rows.clear()
-        finally:
-            self._lock.unlock()
+            self.col_count += count
+            self._data = new_data
     
     def remove_row(self, index: int) -> List[CellData]:
         """Remove row and return data for undo."""
-        self._lock.lock()
-        try:
+        with self._write_lock:
             saved = self.get_row(index)
-            new_data = {}
-            for (row, col), cell in list(self._data.items()):
-                if row == index:
-                    continue
-                elif row > index:
-                    new_data[(row - 1, col)] = cell
-                else:
-                    new_data[(row, col)] = cell
-            self._data = new_data
-            self.row_count = max(0, self.row_count - 1)
+            new_data = _shift_keys(self._data, 0, index, -1)
+            self.formula_cells = _formula_positions(new_data)
             self._cached_rows.clear()
+            self.row_count = max(0, self.row_count - 1)
+            self._data = new_data
             return saved
-        finally:
-            self._lock.unlock()
     
     def remove_column(self, index: int) -> List[CellData]:
         """Remove column and return data for undo."""
-        self._lock.lock()
-        try:
+        with self._write_lock:
             saved = [self.get_cell(r, index) for r in range(self.row_count)]
-            new_data = {}
-            for (row, col), cell in list(self._data.items()):
-                if col == index:
-                    continue
-                elif col > index:
-                    new_data[(row, col - 1)] = cell
-                else:
-                    new_data[(row, col)] = cell
-            self._data = new_data
-            self.col_count = max(0, self.col_count - 1)
+            new_data = _shift_keys(self._data, 1, index, -1)
+            self.formula_cells = _formula_positions(new_data)
             self._cached_rows.clear()
+            self.col_count = max(0, self.col_count - 1)
+            self._data = new_data
             return saved
-        finally:
-            self._lock.unlock()
     
     def get_all_data(self) -> List[List[Dict]]:
-        """Export all data (for saving)."""
-        self._lock.lock()
-        try:
-            result = []
-            for row in range(self.row_count):
-                row_data = []
-                for col in range(self.col_count):
-                    cell = self._data.get((row, col))
-                    row_data.append(cell.to_dict() if cell else CellData().to_dict())
-                result.append(row_data)
-            return result
-        finally:
-            self._lock.unlock()
+        """
+        Export all data (for saving). Stored cells are grouped by row in one pass
+        over the sparse dict; every other position gets a plain empty-cell dict
+        rather than a CellData built only to be converted.
+        """
+        by_row = collections.defaultdict(dict)
+        for (row, col), cell in list(self._data.items()):
+            by_row[row][col] = cell
+        cols = range(self.col_count)
+        result = []
+        for row in range(self.row_count):
+            cells = by_row.get(row)
+            if cells is None:
+                result.append([_empty_cell_dict() for _ in cols])
+            else:
+                result.append([cells[col].to_dict() if col in cells else _empty_cell_dict() for col in cols])
+        return result
     
     def load_all_data(self, data: List[List[Dict]]):
         """Import all data (for loading)."""
-        self._lock.lock()
-        try:
-            self._data.clear()
+        new_data = {}
+        for row, row_data in enumerate(data):
+            for col, cell_data in enumerate(row_data):
+                if cell_data and cell_data.get('value'):
+                    new_data[(row, col)] = CellData.from_dict(cell_data)
+        formula_cells = _formula_positions(new_data)
+        with self._write_lock:
+            self.formula_cells = formula_cells
             self._cached_rows.clear()
-            for row, row_data in enumerate(data):
-                for col, cell_data in enumerate(row_data):
-                    if cell_data and cell_data.get('value'):
-                        self._data[(row, col)] = CellData.from_dict(cell_data)
             self.row_count = len(data)
             self.col_count = len(data[0]) if data else 0
-        finally:
-            self._lock.unlock()
+            self._data = new_data
 
 
 class BackgroundCalculationThread(QThread):
@@ -355,6 +447,22 @@ class VirtualSpreadsheet(QAbstractScrollArea):
         self.viewport_width = 0
         self.viewport_height = 0
         
+        # Paint resources are built once; the paint loop only picks from them
+        self._bg_color = QColor(colors.BG_SPREADSHEET)
+        self._header_bg_color = QColor(colors.BG_DARK_QUATERNARY)
+        self._hover_color = QColor(colors.COLOR_HOVER)
+        self._border_pen = QPen(QColor(colors.BORDER_MEDIUM))
+        self._header_text_pen = QPen(QColor(colors.COLOR_HEADER_TEXT))
+        self._text_pen = QPen(QColor(colors.TEXT_SECONDARY))
+        self._selection_pen = QPen(Qt.GlobalColor.transparent, 2)
+        self._cell_fonts = {}  # (bold, italic, underline) -> QFont
+        for bold, italic, underline in itertools.product((False, True), repeat=3):
+            font = QFont()
+            font.setBold(bold)
+            font.setItalic(italic)
+            font.setUnderline(underline)
+            self._cell_fonts[(bold, italic, underline)] = font
+        
         # Selection
         self.selected_ranges = []
         self._selection_anchor_row = 0
@@ -370,19 +478,30 @@ class VirtualSpreadsheet(QAbstractScrollArea):
         self._updates_deferred = False
         self._render_timer = QTimer()
         self._render_timer.setSingleShot(True)
-        self._render_timer.timeout.connect(self.viewport().update)
+        self._render_timer.timeout.connect(self._flush_repaint)
+        self._pending_repaint = QRegion()  # Cell rects awaiting the render timer
+        self._scroll_pos = (0, 0)  # (h, v) scrollbar values the viewport is painted at
+        self._wheel_remainder = 0  # Partial wheel notches from high-resolution devices
         
         # Dependency tracking
         self.dependents = collections.defaultdict(set)
         self.precedents = collections.defaultdict(set)
         
+        # Hot arithmetic formula shapes run as compiled lambdas; the compiler keeps
+        # per-compile state, so UI-thread and background evaluations take turns
+        self._compiler = FormulaCompiler()
+        self._compiler_lock = threading.Lock()
+        
         # Background calculation
         self._calc_thread = None
+        self._changed_cells: Set[Tuple[int, int]] = set()  # Edits whose dependents await evaluation
+        self._evaluation_requested = False
         self._pending_saves = []
         self._op_thread = None
         self._save_thread = None
         self._save_pending = False
         self._display_cache: Dict[Tuple[int, int], str] = {}
+        self._value_cache: Dict[Tuple[int, int], Any] = {}  # Display text already converted for formulas
         
         # Setup UI
         self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
@@ -440,6 +559,7 @@ class VirtualSpreadsheet(QAbstractScrollArea):
             self.data_store.set_cell(row, col, data)
         elif hasattr(data, 'get_data'):
             self._set_cell_from_dict(row, col, data.get_data())
+        self._update_cells((row, col))
         self._schedule_save()
     
     def _get_visible_range(self) -> Tuple[int, int, int, int]:
@@ -457,6 +577,32 @@ class VirtualSpreadsheet(QAbstractScrollArea):
         
         return start_row, end_row, start_col, end_col
     
+    def _cell_rect(self, row: int, col: int) -> QRect:
+        """Viewport rectangle covered by a cell."""
+        return QRect(
+            col * self.cell_width - self.horizontalScrollBar().value(),
+            row * self.cell_height - self.verticalScrollBar().value(),
+            self.cell_width,
+            self.cell_height
+        )
+    
+    def _update_cells(self, *cells):
+        """
+        Schedule a repaint of just the given cells. Rects are collected until the
+        render timer fires, so a burst of hover moves costs one paint per frame.
+        """
+        for row, col in cells:
+            if row >= 0 and col >= 0:
+                self._pending_repaint += self._cell_rect(row, col)
+        if not self._render_timer.isActive():
+            self._render_timer.start(16)
+    
+    def _flush_repaint(self):
+        """Render timer slot: repaint the collected cell rects."""
+        region, self._pending_repaint = self._pending_repaint, QRegion()
+        if not region.isEmpty():
+            self.viewport().update(region)
+    
     def resizeEvent(self, event):
         """Handle viewport resize."""
         super().resizeEvent(event)
@@ -476,9 +622,23 @@ class VirtualSpreadsheet(QAbstractScrollArea):
         self.horizontalScrollBar().setPageStep(self.viewport_width)
     
     def _on_scroll(self):
-        """Handle scroll events - only re-render visible area."""
-        self._render_timer.stop()
-        self._render_timer.start(16)  # Throttle to ~60 FPS
+        """
+        Handle scroll events: blit the already painted cells by the scroll delta,
+        so only the newly exposed strip goes through paintEvent.
+        """
+        h_scroll = self.horizontalScrollBar().value()
+        v_scroll = self.verticalScrollBar().value()
+        dx = self._scroll_pos[0] - h_scroll
+        dy = self._scroll_pos[1] - v_scroll
+        self._scroll_pos = (h_scroll, v_scroll)
+        
+        viewport = self.viewport()
+        viewport.scroll(dx, dy)
+        self._pending_repaint.translate(dx, dy)
+        if dy:
+            # The header strip stays put while rows scroll under it, so it and
+            # wherever its old pixels were blitted to are painted afresh
+            viewport.update(0, 0, viewport.width(), self.header_height + max(dy, 0))
         self._schedule_evaluation()
     
     def paintEvent(self, event):
@@ -486,22 +646,33 @@ class VirtualSpreadsheet(QAbstractScrollArea):
         painter = QPainter(self.viewport())
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         
-        # Fill background
-        painter.fillRect(self.viewport().rect(), QColor(colors.BG_SPREADSHEET))
-        
         v_scroll = self.verticalScrollBar().value()
         h_scroll = self.horizontalScrollBar().value()
         
-        start_row, end_row, start_col, end_col = self._get_visible_range()
+        visible_range = self._get_visible_range()
         
-        # Render headers and cells
-        self._render_headers(painter, h_scroll, start_col, end_col)
-        self._render_cells(painter, v_scroll, h_scroll, start_row, end_row, start_col, end_col)
+        # After a scroll the dirty region is the exposed strip plus the header strip;
+        # paint each rect on its own so their bounding box doesn't cover the viewport.
+        for dirty in event.region():
+            painter.setClipRect(dirty)
+            painter.fillRect(dirty, self._bg_color)
+            
+            # Clip the cell loop to the dirty rect. Borders are drawn on the far edge of
+            # the previous row/column, so one extra row and column before it are repainted.
+            start_row, end_row, start_col, end_col = visible_range
+            start_row = max(start_row, (dirty.top() + v_scroll) // self.cell_height - 1)
+            end_row = min(end_row, (dirty.bottom() + v_scroll) // self.cell_height)
+            start_col = max(start_col, (dirty.left() + h_scroll) // self.cell_width - 1)
+            end_col = min(end_col, (dirty.right() + h_scroll) // self.cell_width)
+            
+            # Render headers and cells
+            self._render_headers(painter, h_scroll, start_col, end_col)
+            self._render_cells(painter, v_scroll, h_scroll, start_row, end_row, start_col, end_col)
     
     def _render_headers(self, painter, h_scroll, start_col, end_col):
         """Render column headers."""
-        painter.fillRect(0, 0, self.viewport().width(), self.header_height, QColor(colors.BG_DARK_QUATERNARY))
-        painter.setPen(QPen(QColor(colors.BORDER_MEDIUM)))
+        painter.fillRect(0, 0, self.viewport().width(), self.header_height, self._header_bg_color)
+        painter.setPen(self._border_pen)
         
         # Render column headers
         for col in range(start_col, end_col + 1):
@@ -509,105 +680,115 @@ class VirtualSpreadsheet(QAbstractScrollArea):
             painter.drawLine(x + self.cell_width, 0, x + self.cell_width, self.header_height)
             
             col_label = col_int_to_str(col)
-            painter.setPen(QPen(QColor(colors.COLOR_HEADER_TEXT)))
+            painter.setPen(self._header_text_pen)
             painter.drawText(x + 5, 0, self.cell_width - 10, self.header_height, 
                            Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter, col_label)
-            painter.setPen(QPen(QColor(colors.BORDER_MEDIUM)))
+            painter.setPen(self._border_pen)
     
     def _render_cells(self, painter, v_scroll, h_scroll, start_row, end_row, start_col, end_col):
-        """Render visible cells efficiently."""
-        # Render row headers and cells together
+        """
+        Render visible cells in three passes: backgrounds, then every border line
+        in one drawLines call, then text grouped by font and color, so painter
+        state changes once per group instead of several times per cell.
+        """
+        cell_width = self.cell_width
+        cell_height = self.cell_height
+        right = self.viewport().width()
+        get_cell = self.data_store.get_cell
+        hover = (self.hover_row, self.hover_col)
+        selection = self._visible_selection(start_row, end_row, start_col, end_col)
+        
+        # Row headers sit under the cell backgrounds, as before
+        painter.setPen(self._text_pen)
         for row in range(start_row, end_row + 1):
-            y = row * self.cell_height - v_scroll
-            
-            # Render row header
-            painter.fillRect(-h_scroll, y, self.header_width, self.cell_height, QColor(colors.BG_DARK_QUATERNARY))
-            painter.setPen(QPen(QColor(colors.BORDER_MEDIUM)))
-            painter.drawLine(-h_scroll, y + self.cell_height, self.viewport().width(), y + self.cell_height)
-            painter.setPen(QPen(QColor(colors.TEXT_SECONDARY)))
-            painter.drawText(-h_scroll + 5, y, self.header_width - 10, self.cell_height,
+            y = row * cell_height - v_scroll
+            painter.fillRect(-h_scroll, y, self.header_width, cell_height, self._header_bg_color)
+            painter.drawText(-h_scroll + 5, y, self.header_width - 10, cell_height,
                            Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter, str(row + 1))
-            
-            # Render cells
+        
+        # Pass 1: one fill for the default background, then only the cells that differ
+        painter.fillRect(
+            start_col * cell_width - h_scroll,
+            start_row * cell_height - v_scroll,
+            (end_col - start_col + 1) * cell_width,
+            (end_row - start_row + 1) * cell_height,
+            self._bg_color
+        )
+        lines = []
+        selected = []
+        texts = []
+        for row in range(start_row, end_row + 1):
+            y = row * cell_height - v_scroll
+            lines.append(QLine(-h_scroll, y + cell_height, right, y + cell_height))
             for col in range(start_col, end_col + 1):
-                x = col * self.cell_width - h_scroll
-                cell = self.data_store.get_cell(row, col)
-                self._render_cell(painter, x, y, cell, row, col)
-    
-    def _render_cell(self, painter, x, y, cell: CellData, row: int, col: int):
-        """Render a single cell."""
-        # Cell background
-        bg_color = QColor(cell.bg_color) if cell.bg_color else QColor(colors.BG_SPREADSHEET)
-        
-        # Hover effect
-        if row == self.hover_row and col == self.hover_col:
-            bg_color = QColor(colors.COLOR_HOVER)
-            
-        painter.fillRect(x, y, self.cell_width, self.cell_height, bg_color)
+                x = col * cell_width - h_scroll
+                cell = get_cell(row, col)
+                if (row, col) == hover:
+                    painter.fillRect(x, y, cell_width, cell_height, self._hover_color)
+                elif cell.bg_color:
+                    painter.fillRect(x, y, cell_width, cell_height, _qcolor(cell.bg_color))
+                lines.append(QLine(x + cell_width, y, x + cell_width, y + cell_height))
+                if (row, col) in selection:
+                    selected.append(QRect(x, y, cell_width - 1, cell_height - 1))
+                if cell is _EMPTY_CELL:
+                    # Nothing stored: no text to lay out, the border is all it needs
+                    continue
+                texts.append((_font_key(cell.font), cell.text_color or '', x, y, self._get_display_text(row, col)))
         
-        # Cell border
-        painter.setPen(QPen(QColor(colors.BORDER_MEDIUM)))
-        painter.drawLine(x + self.cell_width, y, x + self.cell_width, y + self.cell_height)
+        # Pass 2: borders, plus the selection outline (transparent as requested)
+        painter.setPen(self._border_pen)
+        painter.drawLines(lines)
+        if selected:
+            painter.setPen(self._selection_pen)
+            painter.drawRects(selected)
         
-        # Selection highlight
-        if self._is_cell_selected(row, col):
-            # Make selection background transparent as requested
-            # painter.fillRect(x, y, self.cell_width - 1, self.cell_height - 1, QColor(colors.COLOR_SELECTION_HIGHLIGHT_ALT))
-            
-            # Make selection border transparent as requested
-            painter.setPen(QPen(Qt.GlobalColor.transparent, 2))
-            painter.drawRect(x, y, self.cell_width - 1, self.cell_height - 1)
-        
-        # Cell text
-        font = QFont()
-        if cell.font:
-            font.setBold(cell.font.get('bold', False))
-            font.setItalic(cell.font.get('italic', False))
-            font.setUnderline(cell.font.get('underline', False))
-        painter.setFont(font)
-        
-        text_color = QColor(cell.text_color) if cell.text_color else QColor(colors.TEXT_SECONDARY)
-        painter.setPen(QPen(text_color))
-        painter.drawText(
-            x + 3,
-            y,
-            self.cell_width - 6,
-            self.cell_height,
-            Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft,
-            self._get_display_text(row, col)
-        )
+        # Pass 3: text, switching font and pen only at group boundaries
+        flags = Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft
+        texts.sort(key=lambda entry: entry[:2])
+        for (font_key, text_color), group in itertools.groupby(texts, key=lambda entry: entry[:2]):
+            painter.setFont(self._cell_fonts[font_key])
+            painter.setPen(QPen(_qcolor(text_color)) if text_color else self._text_pen)
+            for _, _, x, y, text in group:
+                painter.drawText(x + 3, y, cell_width - 6, cell_height, flags, text)
     
-    def _is_cell_selected(self, row: int, col: int) -> bool:
-        """Check if cell is selected."""
+    def _visible_selection(self, start_row: int, end_row: int, start_col: int, end_col: int) -> Set[Tuple[int, int]]:
+        """
+        Selected cells inside the given block, built once per paint from the
+        selection ranges clipped to it, so the cell loop does a set lookup
+        instead of scanning every range for every cell.
+        """
+        selection = {(self.current_row, self.current_col)}
         for r_start, r_end, c_start, c_end in self.selected_ranges:
-            if r_start <= row <= r_end and c_start <= col <= c_end:
-                return True
-        return row == self.current_row and col == self.current_col
+            cols = range(max(c_start, start_col), min(c_end, end_col) + 1)
+            for row in range(max(r_start, start_row), min(r_end, end_row) + 1):
+                selection.update((row, col) for col in cols)
+        return selection
     
     def mousePressEvent(self, event):
         """Handle mouse clicks."""
         v_scroll = self.verticalScrollBar().value()
         h_scroll = self.horizontalScrollBar().value()
 
-        x = int(event.position().x())
-        y = int(event.position().y())
+        pos = event.position().toPoint()
+        x = pos.x()
+        y = pos.y()
 
         # Header clicks for row/column selection.
         if y < self.header_height:
-            col = int((x + h_scroll) // self.cell_width)
+            col = (x + h_scroll) // self.cell_width
             if 0 <= col < self.columnCount():
                 self._select_column(col, QApplication.keyboardModifiers())
                 self.viewport().update()
             return
         if x < self.header_width:
-            row = int((y + v_scroll) // self.cell_height)
+            row = (y + v_scroll) // self.cell_height
             if 0 <= row < self.rowCount():
                 self._select_row(row, QApplication.keyboardModifiers())
                 self.viewport().update()
             return
 
-        col = int((x + h_scroll) // self.cell_width)
-        row = int((y + v_scroll) // self.cell_height)
+        col = (x + h_scroll) // self.cell_width
+        row = (y + v_scroll) // self.cell_height
 
         if row < 0 or col < 0 or row >= self.rowCount() or col >= self.columnCount():
             return
@@ -627,34 +808,42 @@ class VirtualSpreadsheet(QAbstractScrollArea):
         v_scroll = self.verticalScrollBar().value()
         h_scroll = self.horizontalScrollBar().value()
         
-        col = int((event.position().x() + h_scroll) // self.cell_width)
-        row = int((event.position().y() + v_scroll) // self.cell_height)
+        # Integer pixel position, so the cell math stays in int floor division
+        pos = event.position().toPoint()
+        col = (pos.x() + h_scroll) // self.cell_width
+        row = (pos.y() + v_scroll) // self.cell_height
         
-        # Update hover state
+        # Update hover state; only the previously and newly hovered cells change
         if row != self.hover_row or col != self.hover_col:
+            self._update_cells((self.hover_row, self.hover_col), (row, col))
             self.hover_row = row
             self.hover_col = col
-            self.viewport().update()
             
         if event.buttons() & Qt.MouseButton.LeftButton:
             if row >= 0 and col >= 0:
+                self._update_cells((self.current_row, self.current_col), (row, col))
                 self.current_row = row
                 self.current_col = col
-                self.viewport().update()
     
     def leaveEvent(self, event):
         """Clear hover state when mouse leaves."""
+        self._update_cells((self.hover_row, self.hover_col))
         self.hover_row = -1
         self.hover_col = -1
-        self.viewport().update()
         super().leaveEvent(event)
     
     def wheelEvent(self, event):
-        """Handle mouse wheel scrolling."""
-        delta = event.angleDelta().y()
-        current_value = self.verticalScrollBar().value()
-        new_value = current_value - delta
-        self.verticalScrollBar().setValue(new_value)
+        """
+        Handle mouse wheel scrolling in whole rows: each 120-unit notch moves
+        wheelScrollLines() rows, so the viewport always scrolls by whole cells.
+        """
+        self._wheel_remainder += event.angleDelta().y()
+        steps = int(self._wheel_remainder / 120)
+        if not steps:
+            return
+        self._wheel_remainder -= steps * 120
+        scrollbar = self.verticalScrollBar()
+        scrollbar.setValue(scrollbar.value() - steps * QApplication.wheelScrollLines() * self.cell_height)
 
     def currentRow(self) -> int:
         return self.current_row
@@ -679,16 +868,46 @@ class VirtualSpreadsheet(QAbstractScrollArea):
             return self._display_cache[(row, col)]
         return str(self.data_store.get_cell(row, col).value)
 
+    def get_cell_value(self, row: int, col: int):
+        """Value a formula sees for a cell: its shown result, as a float when numeric."""
+        if not self.data_store.has_cell(row, col):
+            return 0
+        value = self._value_cache.get((row, col))
+        if value is not None:
+            return value
+        text = self._display_cache.get((row, col))
+        if text is None:
+            text = str(self.data_store.get_cell(row, col).value)
+            if text.startswith('='):
+                # A formula without a result yet; never hand its source text on
+                return "#ERROR"
+        try:
+            return float(text)
+        except ValueError:
+            return text
+
+    def _set_display(self, key, text: str):
+        """
+        Stores a cell's shown text together with the value formulas read from
+        it, so references resolve to a ready float instead of re-parsing text.
+        """
+        self._display_cache[key] = text
+        try:
+            self._value_cache[key] = float(text)
+        except ValueError:
+            self._value_cache[key] = text
+
     def _set_cell_from_dict(self, row: int, col: int, data: Dict):
         current = self.data_store.get_cell(row, col)
         cell = CellData.from_dict(data)
         self.data_store.set_cell(row, col, cell)
         if cell.value.startswith('='):
             self._display_cache.pop((row, col), None)
+            self._value_cache.pop((row, col), None)
         else:
-            self._display_cache[(row, col)] = str(cell.value)
+            self._set_display((row, col), str(cell.value))
         if current.value != cell.value:
-            self._schedule_evaluation()
+            self._schedule_evaluation({(row, col)})
 
     def _select_column(self, col: int, modifiers: Qt.KeyboardModifiers):
         if modifiers & Qt.KeyboardModifier.ShiftModifier:
@@ -728,35 +947,134 @@ class VirtualSpreadsheet(QAbstractScrollArea):
             self.viewport().update()
             self._schedule_evaluation()
     
-    def _schedule_evaluation(self):
-        """Schedule background formula evaluation for visible range."""
+    def _schedule_evaluation(self, changed_cells=None):
+        """
+        Schedule background formula evaluation for the visible range and for
+        every formula downstream of `changed_cells`, in dependency order.
+        """
+        if changed_cells:
+            self._changed_cells.update(changed_cells)
         if self._calc_thread and self._calc_thread.isRunning():
+            # Picked up once the running pass finishes
+            self._evaluation_requested = True
             return
+        self._evaluation_requested = False
+        changed, self._changed_cells = self._changed_cells, set()
 
+        formula_cells = self.data_store.formula_cells
         start_row, end_row, start_col, end_col = self._get_visible_range()
-        cells_with_formulas = []
-        for row in range(start_row, end_row + 1):
-            for col in range(start_col, end_col + 1):
-                cell = self.data_store.get_cell(row, col)
-                if cell.value.startswith('='):
-                    cells_with_formulas.append((row, col))
-        
+        targets = {
+            (row, col) for row, col in formula_cells
+            if start_row <= row <= end_row and start_col <= col <= end_col
+        }
+
+        # Formulas downstream of an edit are stale wherever they are on the sheet
+        targets.update(changed & formula_cells)
+        queue = collections.deque(changed)
+        seen = set(changed)
+        while queue:
+            for dep in self.dependents.get(queue.popleft(), ()):
+                if dep not in seen:
+                    seen.add(dep)
+                    queue.append(dep)
+                    targets.add(dep)
+
+        cells_with_formulas = self._dependency_order(targets)
         if cells_with_formulas:
             self._calc_thread = BackgroundCalculationThread(self, cells_with_formulas)
-            self._calc_thread.finished_calculation.connect(self.viewport().update)
+            self._calc_thread.finished_calculation.connect(self._on_calculation_finished)
             self._calc_thread.start()
+
+    def _dependency_order(self, cells):
+        """
+        Orders formula cells so each comes after the formulas it references
+        (Kahn's algorithm), so one pass leaves no stale results. References are
+        read from the formula text, so the order holds before the first evaluation.
+        Referenced formulas that were never evaluated join the pass as well.
+        Cells still blocked once the queue drains sit on (or behind) a circular
+        reference; they are marked #CYCLE here and left out of the order.
+        """
+        get_cell = self.data_store.get_cell
+        formula_cells = self.data_store.formula_cells
+        display_cache = self._display_cache
+        cells = set(cells)
+        refs_of = {}
+        pending = list(cells)
+        while pending:
+            cell = pending.pop()
+            refs = refs_of[cell] = _formula_refs(get_cell(*cell).value[1:])
+            for ref in refs:
+                if ref not in cells and ref not in display_cache and ref in formula_cells:
+                    cells.add(ref)
+                    pending.append(ref)
+
+        waiting = {}  # cell -> number of its precedents in `cells` still unevaluated
+        followers = collections.defaultdict(list)
+        for cell, refs in refs_of.items():
+            count = 0
+            for ref in refs:
+                if ref in cells and ref != cell:
+                    followers[ref].append(cell)
+                    count += 1
+            waiting[cell] = count
+
+        ready = collections.deque(sorted(cell for cell, count in waiting.items() if count == 0))
+        order = []
+        while ready:
+            cell = ready.popleft()
+            order.append(cell)
+            for follower in followers.get(cell, ()):
+                waiting[follower] -= 1
+                if waiting[follower] == 0:
+                    ready.append(follower)
+
+        if len(order) < len(cells):
+            done = set(order)
+            for cell in cells:
+                if cell in done:
+                    continue
+                # Never evaluated, so record its references for later dependent walks
+                self.clear_dependencies(cell)
+                for ref in refs_of[cell]:
+                    self.add_dependency(cell, ref)
+                self._set_display(cell, "#CYCLE")
+            self.viewport().update()
+        return order
+
+    def _on_calculation_finished(self):
+        self.viewport().update()
+        if self._evaluation_requested:
+            # The signal arrives just before run() returns
+            self._calc_thread.wait()
+            self._schedule_evaluation()
+
+    def add_dependency(self, cell, ref):
+        """Records that formula `cell` reads `ref`; called by FormulaParser."""
+        self.precedents[cell].add(ref)
+        self.dependents[ref].add(cell)
+
+    def clear_dependencies(self, cell):
+        for ref in self.precedents.pop(cell, ()):
+            linked = self.dependents.get(ref)
+            if linked is not None:
+                linked.discard(cell)
     
     def _evaluate_cell_internal(self, row: int, col: int):
         """Evaluate single cell (thread-safe)."""
         cell = self.data_store.get_cell(row, col)
+        self.clear_dependencies((row, col))
         if not cell.value.startswith('='):
-            self._display_cache[(row, col)] = str(cell.value)
+            self._set_display((row, col), str(cell.value))
             return
         
+        parser = _StoreFormulaParser(self, (row, col))
+        try:
+            tokens = _parse_formula(cell.value[1:])
+            with self._compiler_lock:
+                result = self._compiler.evaluate(parser, tokens)
+        except Exception as e:
+            result = f"#ERROR: {str(e)}"
         try:
-            parser = FormulaParser(self, (row, col))
-            result = parser.evaluate(cell.value[1:])
-            
             # Format result
             if isinstance(result, bool):
                 display_value = str(result).upper()
@@ -765,9 +1083,9 @@ class VirtualSpreadsheet(QAbstractScrollArea):
             else:
                 display_value = f"{result:.2f}" if isinstance(result, float) else str(result)
             
-            self._display_cache[(row, col)] = display_value
+            self._set_display((row, col), display_value)
         except Exception:
-            self._display_cache[(row, col)] = "#ERROR"
+            self._set_display((row, col), "#ERROR")
     
     def _schedule_save(self):
         """Defer saving to batch multiple operations."""
@@ -846,8 +1164,14 @@ class VirtualSpreadsheet(QAbstractScrollArea):
     def add_row(self):
         """Add row efficiently."""
         index = self.current_row if self.current_row >= 0 else self.data_store.row_count
+
+        def operation():
+            self.data_store.insert_row(index, 1)
+            self._display_cache = _shift_keys(self._display_cache, 0, index, 1)
+            self._value_cache = _shift_keys(self._value_cache, 0, index, 1)
+
         self._run_data_operation_async(
-            lambda: self.data_store.insert_row(index, 1),
+            operation,
             lambda: (self._update_scrollbars(), self._schedule_save(), self.viewport().update())
         )
     
@@ -858,8 +1182,14 @@ class VirtualSpreadsheet(QAbstractScrollArea):
             return
 
         index = self.current_col if self.current_col >= 0 else self.data_store.col_count
+
+        def operation():
+            self.data_store.insert_column(index, 1)
+            self._display_cache = _shift_keys(self._display_cache, 1, index, 1)
+            self._value_cache = _shift_keys(self._value_cache, 1, index, 1)
+
         self._run_data_operation_async(
-            lambda: self.data_store.insert_column(index, 1),
+            operation,
             lambda: (self._update_scrollbars(), self._schedule_save(), self.viewport().update())
         )
     
@@ -879,11 +1209,8 @@ class VirtualSpreadsheet(QAbstractScrollArea):
             for row in sorted(rows_to_remove, reverse=True):
                 if row < self.data_store.row_count:
                     self.data_store.remove_row(row)
-                    self._display_cache = {
-                        (r - 1 if r > row else r, c): v
-                        for (r, c), v in self._display_cache.items()
-                        if r != row
-                    }
+                    self._display_cache = _shift_keys(self._display_cache, 0, row, -1)
+                    self._value_cache = _shift_keys(self._value_cache, 0, row, -1)
 
         self._run_data_operation_async(
             operation,
@@ -911,11 +1238,8 @@ class VirtualSpreadsheet(QAbstractScrollArea):
             for col in sorted(cols_to_remove, reverse=True):
                 if col < self.data_store.col_count:
                     self.data_store.remove_column(col)
-                    self._display_cache = {
-                        (r, c - 1 if c > col else c): v
-                        for (r, c), v in self._display_cache.items()
-                        if c != col
-                    }
+                    self._display_cache = _shift_keys(self._display_cache, 1, col, -1)
+                    self._value_cache = _shift_keys(self._value_cache, 1, col, -1)
 
         self._run_data_operation_async(
             operation,
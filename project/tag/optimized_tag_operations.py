@@ -5,41 +5,263 @@ Provides batching, progress tracking, and UI responsiveness for tag deletion and
 """
 
 import time
+from contextlib import contextmanager
 from PySide6.QtWidgets import QProgressDialog, QApplication
-from PySide6.QtCore import Qt
+from PySide6.QtCore import (
+    Qt, QModelIndex, QItemSelectionModel, QSignalBlocker, QObject, QTimer, QEventLoop, Slot
+)
+
+
+def _row_runs(sorted_rows):
+    """Groups distinct, descending row indices into (first_row, count) runs of adjacent rows."""
+    runs = []
+    for row in sorted_rows:
+        if runs and runs[-1][0] - 1 == row:
+            runs[-1][0] = row
+            runs[-1][1] += 1
+        else:
+            runs.append([row, 1])
+    return [tuple(run) for run in runs]
+
+
+def _is_interactive(parent_widget, show_ui):
+    """A batch is headless when it has no parent widget and no window is active."""
+    if not show_ui:
+        return False
+    return parent_widget is not None or QApplication.activeWindow() is not None
+
+
+@contextmanager
+def _batched_tree_updates(tag_table):
+    """
+    Blocks the tree's signals and repaints (and sorting, if enabled) for a batch,
+    restoring them and repainting once however the block exits.
+
+    The tag table is also disabled and flagged as busy: run() may spin a local
+    event loop, and input arriving through it must not re-enter the table (or
+    its undo stack) while the tree is half-processed with its signals blocked.
+    """
+    tree = tag_table.table
+    had_focus = tree.hasFocus()
+    tag_table.batch_in_progress = True
+    tag_table.setEnabled(False)
+    blocker = QSignalBlocker(tree)
+    sorting = tree.isSortingEnabled()
+    tree.setSortingEnabled(False)
+    tree.setUpdatesEnabled(False)
+    try:
+        yield
+    finally:
+        blocker.unblock()
+        tree.setSortingEnabled(sorting)
+        tree.setUpdatesEnabled(True)
+        tree.viewport().update()
+        tag_table.setEnabled(True)
+        tag_table.batch_in_progress = False
+        if had_focus:
+            tree.setFocus()
+
+
+def _delete_rows_core(model, runs):
+    """
+    Removes each (first_row, count) run of top-level rows with one removeRows
+    call, so the view gets one rowsRemoved notification per run rather than per
+    row. Yields the number of rows covered after each run.
+    """
+    remove_rows = model.removeRows
+    top_level = QModelIndex()
+    for first, count in runs:
+        remove_rows(first, count, top_level)
+        yield count
+
+
+def _rebuild_without_rows(tree, rows):
+    """
+    Removes top-level rows by taking every item off the tree and re-adding the
+    survivors: two tree calls however scattered the rows are, where removing
+    each run costs a model update proportional to the whole table.
+
+    View state lives in the view rather than the items, so the expanded items
+    at every nesting level, the current item and the scroll position of the
+    survivors are recorded first and restored afterwards.
+    """
+    root = tree.invisibleRootItem()
+    doomed = set(rows)
+    child = root.child
+    kept = [child(row) for row in range(root.childCount()) if row not in doomed]
+
+    expanded = []
+    pending = list(kept)
+    while pending:
+        item = pending.pop()
+        count = item.childCount()
+        if count:  # Leaves have no expansion state
+            if item.isExpanded():
+                expanded.append(item)
+            pending.extend(item.child(i) for i in range(count))
+
+    current = tree.currentItem()
+    current_column = tree.currentColumn()
+    if current is not None:
+        top = current
+        while top.parent():
+            top = top.parent()
+        if root.indexOfChild(top) in doomed:
+            current = None
+    scroll_x = tree.horizontalScrollBar().value()
+    scroll_y = tree.verticalScrollBar().value()
+
+    root.takeChildren()
+    root.addChildren(kept)
+    for item in expanded:
+        item.setExpanded(True)
+    if current is not None:
+        tree.setCurrentItem(current, current_column, QItemSelectionModel.SelectionFlag.NoUpdate)
+    tree.horizontalScrollBar().setValue(scroll_x)
+    tree.verticalScrollBar().setValue(scroll_y)
+
+
+def _build_items_core(tag_table, tags_data, items):
+    """Builds a detached item per tag into items, yielding 1 after each."""
+    build_item = tag_table._build_item_from_data
+    append = items.append
+    for tag_data in tags_data:
+        append(build_item(tag_data))
+        yield 1
+
+
+class _BatchDriver(QObject):
+    """
+    Steps a batch generator from QTimer ticks, one chunk per event-loop turn.
+
+    The generator yields the number of items each step processed. Each tick
+    runs steps until a chunk's worth of items is done, then yields to the event
+    loop so repaints and the progress dialog are serviced between chunks. The
+    first tick processes a small probe; after every tick the chunk is resized
+    from the measured per-item cost to fill one 60 Hz frame. run() waits on a
+    local QEventLoop so callers still get a synchronous result.
+    """
+
+    FRAME_BUDGET = 0.016
+    PROBE_SIZE = 32
+    MAX_CHUNK_SIZE = 1000
+
+    def __init__(self, steps, progress=None):
+        super().__init__()
+        self._steps = steps
+        self._chunk_size = self.PROBE_SIZE
+        self._progress = progress
+        self._completed = False
+        self._error = None
+        self._loop = QEventLoop()
+        self.processed = 0
+
+    def run(self):
+        """Processes every step. Returns False if the user cancelled."""
+        if self._progress is None:
+            # Too small to show progress for: run the steps back to back
+            for _ in self._steps:
+                pass
+            return True
+
+        QTimer.singleShot(0, self._on_tick)
+        self._loop.exec()
+        if self._error is not None:
+            raise self._error
+        return self._completed
+
+    @Slot()
+    def _on_tick(self):
+        start = time.perf_counter()
+        chunk_start = self.processed
+        chunk_end = chunk_start + self._chunk_size
+        step = self._steps.__next__
+        processed = chunk_start
+        try:
+            while processed < chunk_end:
+                processed += step()
+        except StopIteration:
+            self._completed = True
+            self._loop.quit()
+            return
+        except Exception as e:
+            self._error = e
+            self._loop.quit()
+            return
+
+        self.processed = processed
+        per_item = (time.perf_counter() - start) / (processed - chunk_start)
+        self._chunk_size = max(1, min(self.MAX_CHUNK_SIZE, int(self.FRAME_BUDGET / max(per_item, 1e-6))))
+
+        # Progress and cancellation are only touched here, once per chunk; a
+        # window-modal setValue() lets the dialog handle a Cancel click first
+        self._progress.setValue(self.processed)
+        if self._progress.wasCanceled():
+            self._steps.close()
+            self._loop.quit()
+            return
+        QTimer.singleShot(0, self._on_tick)
 
 
 class OptimizedTagDeletion:
     """Handles optimized batch deletion of tags with progress feedback."""
-    
-    # Configuration - matches PerformanceConfig for consistency
-    BATCH_CHUNK_SIZE = 100
+
+    # Configuration - chunk sizes are tuned at runtime by _BatchDriver
     MIN_ITEMS_FOR_PROGRESS = 10
-    
+    MIN_RUNS_FOR_REBUILD = 128
+
     @staticmethod
-    def delete_multiple_tags_optimized(tag_table, rows_to_delete, parent_widget=None):
+    def delete_multiple_tags_optimized(tag_table, rows_to_delete, parent_widget=None, show_ui=True):
         """
         Delete multiple tags in optimized batches with progress feedback.
-        
+
         Args:
             tag_table: The TagTable widget instance
             rows_to_delete: List of row indices to delete (will be sorted descending)
             parent_widget: Parent widget for progress dialog
-            
+            show_ui: Whether a progress dialog may be shown; scripted callers with
+                no parent widget and no active window never get one
+
         Returns:
-            bool: True if deletion completed successfully, False if cancelled
+            bool: True if deletion completed successfully, False if cancelled or
+                another batch is still running on the table
         """
         if not rows_to_delete:
             return True
-        
-        # Sort in reverse order to maintain correct indices during deletion
-        sorted_rows = sorted(rows_to_delete, reverse=True)
+        if tag_table.batch_in_progress:
+            return False
+
+        # Sort in reverse order to maintain correct indices during deletion, dropping
+        # duplicates and rows outside the table up front so the loop needs no
+        # bounds checks and never removes a row twice
+        row_count = tag_table.table.topLevelItemCount()
+        sorted_rows = sorted({row for row in rows_to_delete if 0 <= row < row_count}, reverse=True)
+        if not sorted_rows:
+            return True
         total_rows = len(sorted_rows)
-        
-        # Show progress dialog for large deletions
-        show_progress = total_rows >= OptimizedTagDeletion.MIN_ITEMS_FOR_PROGRESS
+
+        # Deleting every tag: clear the tree in one call instead of removing runs
+        if len(sorted_rows) == row_count:
+            with _batched_tree_updates(tag_table):
+                tag_table.table.clear()
+            tag_table.schedule_save()
+            return True
+
+        # Very scattered selections: rebuilding the top level beats one removal per run
+        runs = _row_runs(sorted_rows)
+        if len(runs) >= OptimizedTagDeletion.MIN_RUNS_FOR_REBUILD:
+            with _batched_tree_updates(tag_table):
+                _rebuild_without_rows(tag_table.table, sorted_rows)
+            tag_table.schedule_save()
+            return True
+
+        # Show progress dialog for large interactive deletions
+        show_progress = (
+            total_rows >= OptimizedTagDeletion.MIN_ITEMS_FOR_PROGRESS
+            and _is_interactive(parent_widget, show_ui)
+        )
         progress = None
-        
+
         try:
             if show_progress:
                 progress = QProgressDialog(
@@ -48,88 +270,65 @@ class OptimizedTagDeletion:
                 )
                 progress.setWindowModality(Qt.WindowModality.WindowModal)
                 progress.setMinimumDuration(500)
-            
-            # Block tree signals to prevent re-rendering during deletion
-            tag_table.table.blockSignals(True)
-            
-            # Process deletions in chunks
-            start_time = time.time()
-            deleted_count = 0
-            
-            for i, row in enumerate(sorted_rows):
-                # Update progress
-                if progress:
-                    if progress.wasCanceled():
-                        tag_table.table.blockSignals(False)
-                        tag_table.table.update()
-                        return False
-                    
-                    progress.setValue(i)
-                    QApplication.processEvents()
-                
-                # Delete the item
-                root = tag_table.table.invisibleRootItem()
-                if 0 <= row < root.childCount():
-                    item = root.takeChild(row)
-                    if item:
-                        deleted_count += 1
-                
-                # Process events periodically to keep UI responsive
-                if (i + 1) % OptimizedTagDeletion.BATCH_CHUNK_SIZE == 0:
-                    QApplication.processEvents()
-            
-            # Re-enable signals and trigger final update
-            tag_table.table.blockSignals(False)
-            tag_table.table.update()
-            
-            # Trigger save after deletion
-            tag_table.save_data()
-            
-            elapsed = time.time() - start_time
-            
+
+            table = tag_table.table
+            with _batched_tree_updates(tag_table):
+                steps = _delete_rows_core(table.model(), runs)
+                batch = _BatchDriver(steps, progress)
+                if not batch.run():
+                    return False
+
+            # Schedule a save after deletion; back-to-back batches coalesce into one
+            tag_table.schedule_save()
+
             if progress:
                 progress.setValue(total_rows)
                 progress.close()
-            
+
             return True
-            
-        except Exception as e:
+
+        except Exception:
             if progress:
                 progress.close()
-            tag_table.table.blockSignals(False)
-            tag_table.table.update()
-            raise e
+            raise
 
 
 class OptimizedTagAddition:
     """Handles optimized batch addition of tags with progress feedback."""
-    
-    # Configuration
-    BATCH_CHUNK_SIZE = 100
+
+    # Configuration - chunk sizes are tuned at runtime by _BatchDriver
     MIN_ITEMS_FOR_PROGRESS = 20
-    
+
     @staticmethod
-    def add_multiple_tags_optimized(tag_table, tags_data, parent_widget=None):
+    def add_multiple_tags_optimized(tag_table, tags_data, parent_widget=None, show_ui=True):
         """
         Add multiple tags in optimized batches with progress feedback.
-        
+
         Args:
             tag_table: The TagTable widget instance
             tags_data: List of tag data dictionaries to add
             parent_widget: Parent widget for progress dialog
-            
+            show_ui: Whether a progress dialog may be shown; scripted callers with
+                no parent widget and no active window never get one
+
         Returns:
-            bool: True if addition completed successfully, False if cancelled
+            bool: True if addition completed successfully, False if cancelled or
+                another batch is still running on the table
         """
         if not tags_data:
             return True
-        
+        if tag_table.batch_in_progress:
+            return False
+
         total_tags = len(tags_data)
-        
-        # Show progress dialog for large additions
-        show_progress = total_tags >= OptimizedTagAddition.MIN_ITEMS_FOR_PROGRESS
+
+        # Show progress dialog for large interactive additions
+        show_progress = (
+            total_tags >= OptimizedTagAddition.MIN_ITEMS_FOR_PROGRESS
+            and _is_interactive(parent_widget, show_ui)
+        )
         progress = None
-        
+
         try:
             if show_progress:
                 progress = QProgressDialog(
@@ -138,50 +337,32 @@ class OptimizedTagAddition:
                 )
                 progress.setWindowModality(Qt.WindowModality.WindowModal)
                 progress.setMinimumDuration(500)
-            
-            # Block signals during batch addition
-            tag_table.table.blockSignals(True)
-            
-            added_count = 0
-            start_time = time.time()
-            
-            for i, tag_data in enumerate(tags_data):
-                # Update progress
-                if progress:
-                    if progress.wasCanceled():
-                        tag_table.table.blockSignals(False)
-                        tag_table.table.update()
-                        return False
-                    
-                    progress.setValue(i)
-                    QApplication.processEvents()
-                
-                # Add the tag using the standard method
-                tag_table._add_tag_from_data(tag_data)
-                added_count += 1
-                
-                # Process events periodically to keep UI responsive
-                if (i + 1) % OptimizedTagAddition.BATCH_CHUNK_SIZE == 0:
-                    QApplication.processEvents()
-            
-            # Re-enable signals and trigger final update
-            tag_table.table.blockSignals(False)
-            tag_table.table.update()
-            
-            # Trigger save after addition
-            tag_table.save_data()
-            
-            elapsed = time.time() - start_time
-            
+
+            table = tag_table.table
+            with _batched_tree_updates(tag_table):
+                items = []
+                steps = _build_items_core(tag_table, tags_data, items)
+                batch = _BatchDriver(steps, progress)
+                if not batch.run():
+                    return False
+
+                # Attach every item with a single model insert; array items can
+                # only be expanded once they are in the tree
+                table.addTopLevelItems(items)
+                for item in items:
+                    if item.childCount():
+                        item.setExpanded(True)
+
+            # Schedule a save after addition; back-to-back batches coalesce into one
+            tag_table.schedule_save()
+
             if progress:
                 progress.setValue(total_tags)
                 progress.close()
-            
+
             return True
-            
-        except Exception as e:
+
+        except Exception:
             if progress:
                 progress.close()
-            tag_table.table.blockSignals(False)
-            tag_table.table.update()
-            raise e
+            raise
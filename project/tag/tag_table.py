@@ -9,7 +9,7 @@ from PySide6.QtWidgets import (
     QDateEdit, QTimeEdit, QDateTimeEdit, QTreeWidgetItemIterator, QProgressDialog,
     QMenu
 )
-from PySide6.QtCore import Qt, QMimeData, QDate, QTime, QDateTime
+from PySide6.QtCore import Qt, QMimeData, QDate, QTime, QDateTime, QTimer
 from PySide6.QtGui import QAction, QUndoStack, QUndoCommand, QKeySequence, QColor, QBrush
 from main_window.services.icon_service import IconService
 from main_window.widgets.tree import CustomTreeWidget
@@ -32,6 +32,10 @@ DATA_TYPE_RANGES = {
     "Unsign Int32": (0, 4294967295),
 }
 
+# Array element formats, compiled once: e.g. "10", "10x10" or "2x3x4"
+_ARRAY_FMT_RE = re.compile(r'^[1-9]\d*(?:x[1-9]\d*){0,2}$')
+_DIM_SPLIT_RE = re.compile(r'[xX]')
+
 # --- Undo Commands ---
 
 class TagChangeCommand(QUndoCommand):
@@ -107,7 +111,11 @@ class TagRemoveCommand(QUndoCommand):
                 self.table.table.takeTopLevelItem(row)
         
         self.table.block_signals(False)
-        self.table.save_data()
+        # Batches debounce their save, so a quick run of batch undo/redo saves once
+        if self.is_batch:
+            self.table.schedule_save()
+        else:
+            self.table.save_data()
 
     def undo(self):
         self.table.block_signals(True)
@@ -123,7 +131,11 @@ class TagRemoveCommand(QUndoCommand):
                 self.table._insert_tag_item(row, data)
         
         self.table.block_signals(False)
-        self.table.save_data()
+        # Batches debounce their save, so a quick run of batch undo/redo saves once
+        if self.is_batch:
+            self.table.schedule_save()
+        else:
+            self.table.save_data()
 
 class TagCutCommand(QUndoCommand):
     """Command for cutting (removing) tags."""
@@ -192,7 +204,7 @@ class ArrayElementsDelegate(QStyledItemDelegate):
         old_val = str(index.model().data(index, Qt.ItemDataRole.EditRole))
         
         # Regex to match N, NxM, or NxMxK where N,M,K are positive integers
-        if not re.match(r'^[1-9]\d*(?:x[1-9]\d*){0,2}$', text):
+        if not _ARRAY_FMT_RE.match(text):
              QMessageBox.warning(self.tag_table, "Invalid Format", 
                                  "Invalid array format.\n"
                                  "Accepted formats:\n"
@@ -481,6 +493,15 @@ class TagTable(QWidget):
         if 'tags' not in self.tag_data:
             self.tag_data['tags'] = []
 
+        # Set while a batch operation runs; edits are refused until it finishes
+        self.batch_in_progress = False
+
+        # Batch operations schedule their save here, so a burst of batches
+        # serializes the table once; flush_pending_save() forces it early
+        self._pending_save_timer = QTimer(self)
+        self._pending_save_timer.setSingleShot(True)
+        self._pending_save_timer.timeout.connect(self.save_data)
+
         self.setup_ui()
         self.load_data()
 
@@ -578,6 +599,14 @@ class TagTable(QWidget):
         self.block_signals(False)
 
     def _insert_tag_item(self, index, tag_dict):
+        item = self._build_item_from_data(tag_dict)
+        self.table.insertTopLevelItem(index, item)
+        # Expansion only takes effect once the item is in the tree
+        if item.childCount():
+            item.setExpanded(True)
+
+    def _build_item_from_data(self, tag_dict):
+        """Builds a top-level tag item, with its array children, without adding it to the tree."""
         item = QTreeWidgetItem()
         item.setFlags(item.flags() | Qt.ItemFlag.ItemIsEditable)
         
@@ -591,11 +620,10 @@ class TagTable(QWidget):
         
         # Store child values in UserRole of column 1 if needed, or rely on tag_dict passed here
         item.setData(0, Qt.ItemDataRole.UserRole, tag_dict)
-
-        self.table.insertTopLevelItem(index, item)
         
         # Generate children if it's an array
         self._update_array_children(item, tag_dict.get('child_values', {}))
+        return item
 
     def _update_array_children(self, parent_item, child_values=None):
         """Regenerates child items based on Array Elements dimension string."""
@@ -624,7 +652,7 @@ class TagTable(QWidget):
         """Parses '10', '10x10' etc. Returns empty list for invalid dimensions."""
         if not dim_str: return []
         try:
-            parts = re.split(r'[xX]', str(dim_str))
+            parts = _DIM_SPLIT_RE.split(str(dim_str))
             # Filter for valid digits and convert to int, exclude 0 and empty strings
             dims = []
             for p in parts:
@@ -650,6 +678,11 @@ class TagTable(QWidget):
             child.setText(0, f"Array too large ({count} items)")
             return
 
+        # Children inherit the parent's type, so resolve it and its default once
+        # per level rather than per child
+        parent_type = parent_item.text(1)
+        default_val = TagTable._get_default_value_for_type(parent_type)
+
         for i in range(count):
             child = QTreeWidgetItem(parent_item)
             indices = current_indices + [i]
@@ -668,14 +701,10 @@ class TagTable(QWidget):
             c_data = child_values.get(key, {})
             
             # Column 1: Type (Inherit from parent, read-only via delegate)
-            child.setText(1, parent_item.text(1)) 
+            child.setText(1, parent_type) 
             
             # Column 2: Initial Value (Editable)
-            # Use datatype-specific default if no child data exists
-            parent_type = parent_item.text(1)
-            default_val = TagTable._get_default_value_for_type(parent_type)
-            
-            # Use existing value from child data if present
+            # Use existing value from child data if present, else the datatype default
             val_to_set = c_data.get('initial_value', default_val)
             child.setText(2, val_to_set)
             
@@ -873,18 +902,8 @@ class TagTable(QWidget):
 
         self.save_data()
 
-    def _add_tag_from_data(self, tag_data):
-        """
-        Add a tag directly from a data dictionary.
-        Used by OptimizedTagAddition for batch operations.
-        
-        Args:
-            tag_data: Dictionary containing tag properties
-        """
-        row = self.table.topLevelItemCount()
-        self._insert_tag_item(row, tag_data)
-
     def add_tag(self):
+        if self.batch_in_progress: return
         row = self.table.topLevelItemCount()
         
         base_name = "Tag"
@@ -914,6 +933,7 @@ class TagTable(QWidget):
         self.undo_stack.push(command)
 
     def remove_tag(self):
+        if self.batch_in_progress: return
         # Get selected top level items
         selected_items = self.table.selectedItems()
         rows_to_remove = set()
@@ -958,9 +978,11 @@ class TagTable(QWidget):
         self.remove_tag()
 
     def undo(self):
+        if self.batch_in_progress: return
         self.undo_stack.undo()
 
     def redo(self):
+        if self.batch_in_progress: return
         self.undo_stack.redo()
 
     def setup_keyboard_shortcuts(self):
@@ -1037,12 +1059,14 @@ class TagTable(QWidget):
 
     def cut(self):
         """Cut selected tags (copy and delete)."""
+        if self.batch_in_progress: return
         self.copy()
         if self.clipboard_data:
             self.remove_tag()
 
     def paste(self):
         """Paste tags from clipboard."""
+        if self.batch_in_progress: return
         if not self.clipboard_data:
             QMessageBox.warning(self, "Paste", "Clipboard is empty. No tags to paste.")
             return
@@ -1087,7 +1111,18 @@ class TagTable(QWidget):
         QMessageBox.information(self, "Paste", f"Pasted {len(tags_to_paste)} tag(s).")
 
 
+    def schedule_save(self, delay=250):
+        """Saves after delay ms; scheduling again before then restarts the wait."""
+        self._pending_save_timer.start(delay)
+
+    def flush_pending_save(self):
+        """Runs a scheduled save now, if one is pending and no batch is mid-way."""
+        if self._pending_save_timer.isActive() and not self.batch_in_progress:
+            self.save_data()
+
     def save_data(self):
+        # A direct save supersedes any scheduled one
+        self._pending_save_timer.stop()
         tags = []
         for row in range(self.table.topLevelItemCount()):
             tags.append(self._get_row_data(row))
@@ -3,6 +3,8 @@ Centralized stylesheet generator for the HMI Designer Application.
 All QSS/CSS style strings are generated using theme variables.
 """
 
+from functools import lru_cache
+
 from styles import colors as c
 
 
@@ -10,6 +12,7 @@ from styles import colors as c
 # TREE WIDGET STYLESHEETS
 # ============================================================================
 
+@lru_cache(maxsize=8)
 def get_tree_widget_stylesheet(expand_icon_path: str = "", collapse_icon_path: str = "", 
                                vline_path: str = "", branch_more_path: str = "", 
                                branch_end_path: str = "") -> str:
@@ -28,6 +31,10 @@ def get_tree_widget_stylesheet(expand_icon_path: str = "", collapse_icon_path: s
         
     Returns:
         QSS stylesheet string for tree widgets
+        
+    Note:
+        Results are memoized per icon-path combination since every tree
+        instance requests the same composed stylesheet.
     """
     # Base stylesheet with widget-level selection styling to avoid double styling
     base_stylesheet = f"""
@@ -480,6 +487,10 @@ def get_color_picker_button_stylesheet(color_hex: str, is_selected: bool = False
     return f"background-color: {color_hex}; border: {border}; border-radius: 2px;"
 
 
+# Theme part is resolved once at import; only the background varies per call.
+WIDGET_COLOR_BUTTON_TEMPLATE = "background-color: {}; border: 1px solid " + c.BORDER_MEDIUM + ";"
+
+
 def get_widget_color_button_stylesheet(color_hex: str) -> str:
     """
     Generate stylesheet for widget color picker buttons (gradient_widget, pattern_widget).
@@ -490,7 +501,7 @@ def get_widget_color_button_stylesheet(color_hex: str) -> str:
     Returns:
         QSS stylesheet string for color button
     """
-    return f"background-color: {color_hex}; border: 1px solid {c.BORDER_MEDIUM};"
+    return WIDGET_COLOR_BUTTON_TEMPLATE.format(color_hex)
 
 
 # ============================================================================